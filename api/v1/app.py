@@ -3,11 +3,33 @@
 
 import os
 from flask import Flask, jsonify
+from flask.json.provider import DefaultJSONProvider
 from models import storage
+from models.engine import codec
 from api.v1.views import app_views
 from flask_cors import CORS
 
+
+class CodecJSONProvider(DefaultJSONProvider):
+    """JSON provider encoding and decoding through the storage codec"""
+
+    def dumps(self, obj, **kwargs):
+        """returns the JSON string of obj"""
+        # the codec writes compact JSON, anything else goes to json
+        if kwargs and kwargs != {"separators": (",", ":")}:
+            return super().dumps(obj, **kwargs)
+        return codec.dumps(obj, sort_keys=self.sort_keys,
+                           default=self.default)
+
+    def loads(self, s, **kwargs):
+        """returns the object decoded from the JSON s"""
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return codec.loads(s)
+
+
 app = Flask(__name__)
+app.json = CodecJSONProvider(app)
 
 app.register_blueprint(app_views)
 
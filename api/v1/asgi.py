@@ -0,0 +1,117 @@
+#!/usr/bin/python3
+"""ASGI entry point of the API: the event loop reads requests and writes
+responses, the views and their storage calls run on a bounded pool of
+threads (serve it with: uvicorn api.v1.asgi:app)"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+import os
+import sys
+from api.v1.app import app as wsgi_app
+
+# threads running the views, requests past them wait holding no thread
+executor = ThreadPoolExecutor(int(os.getenv('HBNB_API_WORKERS', 32)),
+                              thread_name_prefix="hbnb-api")
+
+
+def environ(scope, body):
+    """returns the WSGI environ of the ASGI http scope and its body"""
+    server = scope.get("server") or ("localhost", 80)
+    client = scope.get("client") or ("", 0)
+    env = {"REQUEST_METHOD": scope["method"],
+           "SCRIPT_NAME": scope.get("root_path", "").encode().decode(
+               "latin1"),
+           "PATH_INFO": scope["path"].encode().decode("latin1"),
+           "QUERY_STRING": scope["query_string"].decode("latin1"),
+           "SERVER_NAME": server[0], "SERVER_PORT": str(server[1]),
+           "SERVER_PROTOCOL": "HTTP/" + scope.get("http_version", "1.1"),
+           "REMOTE_ADDR": client[0], "REMOTE_PORT": str(client[1]),
+           "CONTENT_LENGTH": str(len(body)),
+           "wsgi.version": (1, 0),
+           "wsgi.url_scheme": scope.get("scheme", "http"),
+           "wsgi.input": BytesIO(body), "wsgi.errors": sys.stderr,
+           "wsgi.multithread": True, "wsgi.multiprocess": False,
+           "wsgi.run_once": False}
+    for name, value in scope["headers"]:
+        name = name.decode("latin1").upper().replace("-", "_")
+        value = value.decode("latin1")
+        if name == "CONTENT_TYPE":
+            env[name] = value
+        elif name != "CONTENT_LENGTH":
+            name = "HTTP_" + name
+            env[name] = env[name] + "," + value if name in env else value
+    return env
+
+
+def respond(env, send, loop):
+    """runs the Flask app on env and sends its response, from a thread"""
+    start = []
+
+    def start_response(status, headers, exc_info=None):
+        """keeps the status and headers to send with the first chunk"""
+        start[:] = [{"type": "http.response.start",
+                     "status": int(status.split(" ", 1)[0]),
+                     "headers": [(name.lower().encode("latin1"),
+                                  value.encode("latin1"))
+                                 for name, value in headers]}]
+
+    def deliver(chunk, more):
+        """sends chunk, waiting for the loop so a slow client slows us"""
+        messages = start[:]
+        del start[:]
+        messages.append({"type": "http.response.body", "body": chunk,
+                         "more_body": more})
+        asyncio.run_coroutine_threadsafe(emit(send, messages), loop).result()
+
+    result = wsgi_app(env, start_response)
+    try:
+        # held back one chunk, so the last one goes out flagged as last
+        held = b""
+        for chunk in result:
+            if chunk:
+                if held:
+                    deliver(held, True)
+                held = chunk
+        deliver(held, False)
+    finally:
+        if hasattr(result, "close"):
+            result.close()
+
+
+async def emit(send, messages):
+    """sends the ASGI messages in order"""
+    for message in messages:
+        await send(message)
+
+
+async def app(scope, receive, send):
+    """ASGI application serving the API views"""
+    if scope["type"] == "lifespan":
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+    if scope["type"] != "http":
+        raise ValueError("unsupported ASGI scope " + scope["type"])
+    body = []
+    more = True
+    while more:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            return
+        body.append(message.get("body", b""))
+        more = message.get("more_body", False)
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(executor, respond,
+                               environ(scope, b"".join(body)), send, loop)
+
+
+if __name__ == "__main__":
+    import uvicorn
+    host = os.getenv('HBNB_API_HOST', '0.0.0.0')
+    port = int(os.getenv('HBNB_API_PORT', 5000))
+    uvicorn.run(app, host=host, port=port, log_level="warning")
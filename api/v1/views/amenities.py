@@ -6,13 +6,16 @@ from api.v1.views import app_views
 from models import storage
 from models.base_model import BaseModel
 from models.amenity import Amenity
+from api.v1.views.cache import cached
+from api.v1.views.conditional import json_resource
+from api.v1.views.paging import paginate
 
 
 @app_views.route('/amenities', methods=['GET'], strict_slashes=False)
+@cached(Amenity)
 def get_amenities():
     """Retrieves the list of all Amenity objects"""
-    amenity = [amenity.to_dict() for amenity in storage.all(Amenity).values()]
-    return jsonify(amenity)
+    return paginate(Amenity)
 
 
 @app_views.route('/amenities/<amenity_id>', methods=['GET'],
@@ -22,7 +25,7 @@ def get_amenity(amenity_id):
     amenity = storage.get(Amenity, amenity_id)
     if amenity is None:
         abort(404)
-    return jsonify(amenity.to_dict())
+    return json_resource(amenity)
 
 
 @app_views.route('/amenities', methods=['POST'], strict_slashes=False)
@@ -0,0 +1,129 @@
+#!/usr/bin/python3
+""" Batch RESTful API """
+
+from datetime import datetime
+from flask import jsonify, abort, request
+from api.v1.views import app_views
+from models import storage
+from models.amenity import Amenity
+from models.base_model import time
+from models.city import City
+from models.place import Place
+from models.review import Review
+from models.state import State
+from models.user import User
+
+# resource: (class, required keys, parent classes by key, keys not updated)
+resources = {
+    "amenities": (Amenity, ["name"], {}, []),
+    "cities": (City, ["state_id", "name"], {"state_id": State},
+               ["state_id"]),
+    "places": (Place, ["city_id", "user_id", "name"],
+               {"city_id": City, "user_id": User}, ["city_id", "user_id"]),
+    "reviews": (Review, ["place_id", "user_id", "text"],
+                {"place_id": Place, "user_id": User},
+                ["place_id", "user_id"]),
+    "states": (State, ["name"], {}, []),
+    "users": (User, ["email", "password"], {}, ["email"]),
+}
+
+
+def create_item(resource, data):
+    """checks one object of resource to create, returns its result and the
+    change creating it"""
+    cls, required, parents, ignore = resources[resource]
+    if type(data) is not dict:
+        return {"status": 400, "error": "Not a JSON"}, None
+    for key in required:
+        if key not in data:
+            return {"status": 400, "error": "Missing " + key}, None
+    if type(data.get('id', "")) is not str:
+        return {"status": 400, "error": "Invalid id"}, None
+    for key in ['created_at', 'updated_at']:
+        if type(data.get(key)) is str:
+            try:
+                datetime.strptime(data[key], time)
+            except ValueError:
+                return {"status": 400, "error": "Invalid " + key}, None
+    for key, parent in parents.items():
+        if type(data[key]) is not str or \
+                storage.get(parent, data[key]) is None:
+            return {"status": 404, "error": "Not found"}, None
+    obj = cls(**data)
+    return {"status": 201, "object": obj.to_dict()}, \
+        lambda: storage.new(obj)
+
+
+def update_item(resource, data):
+    """checks one object of resource to update, returns its result and the
+    change updating it"""
+    cls, required, parents, ignore = resources[resource]
+    if type(data) is not dict:
+        return {"status": 400, "error": "Not a JSON"}, None
+    if 'id' not in data:
+        return {"status": 400, "error": "Missing id"}, None
+    obj = storage.get(cls, data['id']) if type(data['id']) is str else None
+    if obj is None:
+        return {"status": 404, "error": "Not found"}, None
+    result = {"status": 200}
+
+    def change():
+        """sets the attributes of data on obj"""
+        for key, value in data.items():
+            if key not in ['id', 'created_at', 'updated_at'] + ignore:
+                setattr(obj, key, value)
+        obj.updated_at = datetime.utcnow()
+        storage.new(obj)
+        result["object"] = obj.to_dict()
+
+    return result, change
+
+
+def delete_item(resource, id):
+    """checks one object of resource to delete, returns its result and the
+    change deleting it"""
+    cls = resources[resource][0]
+    obj = storage.get(cls, id) if type(id) is str else None
+    if obj is None:
+        return {"status": 404, "error": "Not found"}, None
+    return {"status": 200}, lambda: storage.delete(obj)
+
+
+@app_views.route('/amenities/batch', methods=['POST', 'PUT', 'DELETE'],
+                 strict_slashes=False, defaults={'resource': 'amenities'})
+@app_views.route('/cities/batch', methods=['POST', 'PUT', 'DELETE'],
+                 strict_slashes=False, defaults={'resource': 'cities'})
+@app_views.route('/places/batch', methods=['POST', 'PUT', 'DELETE'],
+                 strict_slashes=False, defaults={'resource': 'places'})
+@app_views.route('/reviews/batch', methods=['POST', 'PUT', 'DELETE'],
+                 strict_slashes=False, defaults={'resource': 'reviews'})
+@app_views.route('/states/batch', methods=['POST', 'PUT', 'DELETE'],
+                 strict_slashes=False, defaults={'resource': 'states'})
+@app_views.route('/users/batch', methods=['POST', 'PUT', 'DELETE'],
+                 strict_slashes=False, defaults={'resource': 'users'})
+def batch(resource):
+    """Creates, updates or deletes a list of objects with a single save"""
+    if not request.is_json:
+        abort(400, description="Not a JSON")
+    items = request.get_json()
+    if type(items) is not list:
+        abort(400, description="Not a JSON list")
+    action = {"POST": create_item, "PUT": update_item,
+              "DELETE": delete_item}[request.method]
+    # every item is checked before the storage is changed
+    checked = [action(resource, item) for item in items]
+    results = [result for result, change in checked]
+    changes = [change for result, change in checked if change is not None]
+    if changes:
+        try:
+            for change in changes:
+                change()
+            storage.save()
+        except Exception:
+            # nothing of the batch is kept when it cannot be saved whole
+            storage.rollback()
+            for result, change in checked:
+                if change is not None:
+                    result.clear()
+                    result.update(status=409, error="Not saved")
+    return jsonify(results), 200
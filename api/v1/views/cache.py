@@ -0,0 +1,131 @@
+#!/usr/bin/python3
+""" Response cache for the read-mostly API views """
+
+from collections import OrderedDict
+from functools import wraps
+from os import getenv
+from threading import Lock
+from time import monotonic
+from uuid import uuid4
+from flask import make_response, request, Response
+from models import storage
+from models.engine import codec
+
+
+class LocalBackend:
+    """in-process LRU store standing in for a shared cache server"""
+
+    def __init__(self, size=1024):
+        """Instantiate a LocalBackend holding up to size entries"""
+        self.__size = size
+        self.__entries = OrderedDict()
+        self.__counters = {}
+        # the counters restart with the process, the epoch tells them apart
+        self.epoch = uuid4().hex
+        self.__lock = Lock()
+
+    def get(self, key):
+        """returns the value stored under key, None if missing or expired"""
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is None:
+                return None
+            value, expires = entry
+            if expires <= monotonic():
+                del self.__entries[key]
+                return None
+            self.__entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        """stores value under key for ttl seconds"""
+        with self.__lock:
+            self.__entries[key] = (value, monotonic() + ttl)
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.__size:
+                self.__entries.popitem(last=False)
+
+    def counter(self, key):
+        """returns the value of the counter key"""
+        return self.__counters.get(key, 0)
+
+    def incr(self, key):
+        """increments the counter key, which is never evicted"""
+        with self.__lock:
+            self.__counters[key] = self.__counters.get(key, 0) + 1
+
+
+class RedisBackend:
+    """store shared by every worker through a Redis server"""
+
+    def __init__(self, url):
+        """Instantiate a RedisBackend connected to url"""
+        import redis
+        self.__redis = redis.Redis.from_url(url)
+        # the counters are kept by the server, shared by every worker
+        self.epoch = ""
+
+    def get(self, key):
+        """returns the value stored under key, None if missing or expired"""
+        return self.__redis.get(key)
+
+    def set(self, key, value, ttl):
+        """stores value under key for ttl seconds"""
+        self.__redis.set(key, value, ex=ttl)
+
+    def counter(self, key):
+        """returns the value of the counter key"""
+        return int(self.__redis.get(key) or 0)
+
+    def incr(self, key):
+        """increments the counter key"""
+        self.__redis.incr(key)
+
+
+# seconds a response stays cached, 0 disables the cache
+ttl = int(getenv('HBNB_API_CACHE_TTL', 60))
+if getenv('HBNB_API_CACHE_URL'):
+    backend = RedisBackend(getenv('HBNB_API_CACHE_URL'))
+else:
+    backend = LocalBackend(int(getenv('HBNB_API_CACHE_SIZE', 1024)))
+# a change to a class moves its version, so keys built on the old one die
+storage.subscribe(lambda name: backend.incr("version:" + name))
+
+
+def versions(names):
+    """returns the current version of each class name"""
+    # changes saved by other workers move the versions read below
+    storage.refresh()
+    return [str(backend.counter("version:" + name)) for name in names]
+
+
+def cached(*classes):
+    """caches the responses of a view built from objects of classes"""
+    names = [cls.__name__ for cls in classes]
+
+    def decorator(view):
+        """wraps view with the cache lookup"""
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            """returns the cached response, or caches the view's one"""
+            if ttl <= 0:
+                return view(*args, **kwargs)
+            key = "response:{}:{}".format(request.full_path,
+                                          ",".join(versions(names)))
+            value = backend.get(key)
+            if value is not None:
+                entry = codec.loads(value)
+                response = Response(entry["body"], headers=entry["headers"],
+                                    mimetype="application/json")
+                return response.make_conditional(request)
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                headers = {header: response.headers[header]
+                           for header in ["ETag", "Last-Modified", "Link"]
+                           if header in response.headers}
+                backend.set(key, codec.dumps({
+                    "body": response.get_data(as_text=True),
+                    "headers": headers}), ttl)
+            return response
+        return wrapper
+    return decorator
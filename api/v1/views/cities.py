@@ -7,6 +7,8 @@ from models import storage
 from models.base_model import BaseModel
 from models.state import State
 from models.city import City
+from api.v1.views.conditional import json_resource
+from api.v1.views.paging import paginate
 
 
 @app_views.route('/states/<state_id>/cities', methods=['GET'],
@@ -17,8 +19,7 @@ def get_cities(state_id):
     if state is None:
         abort(404)
 
-    cities = [city.to_dict() for city in state.cities]
-    return jsonify(cities)
+    return paginate(City, state_id=state.id)
 
 
 @app_views.route('/cities/<city_id>', methods=['GET'], strict_slashes=False)
@@ -28,7 +29,7 @@ def get_city(city_id):
     if city is None:
         abort(404)
 
-    return jsonify(city.to_dict())
+    return json_resource(city)
 
 
 @app_views.route('/states/<state_id>/cities', methods=['POST'],
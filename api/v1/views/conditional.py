@@ -0,0 +1,50 @@
+#!/usr/bin/python3
+""" Conditional GET support for the API views """
+
+from datetime import timezone
+import hashlib
+from flask import jsonify, request, Response
+from werkzeug.http import is_resource_modified
+from models.base_model import isoformat
+from api.v1.views.cache import backend, versions
+
+
+def etag_of(objs):
+    """returns a strong ETag from the class, id and updated_at of objs"""
+    digest = hashlib.sha1()
+    for obj in objs:
+        digest.update("{}.{}@{}\n".format(obj.__class__.__name__, obj.id,
+                                          isoformat(obj.updated_at))
+                      .encode())
+    return digest.hexdigest()
+
+
+def collection_etag(cls, filters, limit=None, cursor=None):
+    """returns a strong ETag from the version of cls, the filters and the
+    page, without reading any object"""
+    tag = [backend.epoch, cls.__name__] + versions([cls.__name__])
+    tag += ["{}={}".format(attr, value)
+            for attr, value in sorted(filters.items())]
+    tag += [str(limit), str(cursor)]
+    return hashlib.sha1("\n".join(tag).encode()).hexdigest()
+
+
+def conditional(etag, build, last_modified=None):
+    """returns a 304 if the client holds the etag, else build()"""
+    if last_modified is not None:
+        last_modified = last_modified.replace(tzinfo=timezone.utc)
+    if is_resource_modified(request.environ, etag=etag,
+                            last_modified=last_modified):
+        response = build()
+    else:
+        response = Response(status=304)
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    return response
+
+
+def json_resource(obj):
+    """returns the JSON of obj tagged with its ETag and Last-Modified"""
+    return conditional(etag_of([obj]), lambda: jsonify(obj.to_dict()),
+                       obj.updated_at)
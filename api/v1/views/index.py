@@ -1,7 +1,7 @@
 #!/usr/bin/python3
 """Module"""
 
-from flask import jsonify
+from flask import abort, jsonify, request
 from models import storage
 from models.amenity import Amenity
 from models.city import City
@@ -10,6 +10,7 @@ from models.review import Review
 from models.state import State
 from models.user import User
 from api.v1.views import app_views
+from api.v1.views.cache import cached
 
 
 @app_views.route('/status', methods=['GET'])
@@ -18,15 +19,27 @@ def api_status():
     return jsonify({"status": "OK"})
 
 
+@app_views.route('/pool', methods=['GET'])
+def get_pool():
+    """Returns the metrics of the database connection pool"""
+    if not hasattr(storage, "pool_stats"):
+        abort(404)
+    return jsonify(storage.pool_stats())
+
+
 @app_views.route('/stats', methods=['GET'])
+@cached(Amenity, City, Place, Review, State, User)
 def get_stats():
     """Returns the count of objects for each model"""
+    totals = storage.counts()
     counts = {
-        "amenities": storage.count(Amenity),
-        "cities": storage.count(City),
-        "places": storage.count(Place),
-        "reviews": storage.count(Review),
-        "states": storage.count(State),
-        "users": storage.count(User)
+        "amenities": totals[Amenity.__name__],
+        "cities": totals[City.__name__],
+        "places": totals[Place.__name__],
+        "reviews": totals[Review.__name__],
+        "states": totals[State.__name__],
+        "users": totals[User.__name__]
     }
-    return jsonify(counts)
+    response = jsonify(counts)
+    response.add_etag()
+    return response.make_conditional(request)
@@ -0,0 +1,54 @@
+#!/usr/bin/python3
+""" Pagination of the collection views """
+
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime
+import json
+from urllib.parse import urlencode
+from flask import abort, request
+from models import storage
+from api.v1.views.conditional import collection_etag, conditional
+from api.v1.views.streaming import stream_json
+from models.base_model import isoformat, time
+
+
+def encode_cursor(obj):
+    """returns the cursor resuming a listing after obj"""
+    keyset = json.dumps([isoformat(obj.created_at), obj.id])
+    return urlsafe_b64encode(keyset.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """returns the (created_at, id) keyset held by a cursor"""
+    try:
+        keyset = json.loads(urlsafe_b64decode(cursor.encode()))
+        if type(keyset) is not list or len(keyset) != 2 or \
+                type(keyset[1]) is not str:
+            raise ValueError("cursor is not a [created_at, id] list")
+        return (datetime.strptime(keyset[0], time), keyset[1])
+    except (TypeError, ValueError):
+        abort(400, description="Invalid cursor")
+
+
+def paginate(cls, **filters):
+    """returns the JSON list of the cls objects in the requested page"""
+    limit = request.args.get('limit', type=int)
+    cursor = request.args.get('cursor')
+    if 'limit' in request.args and (limit is None or limit < 1):
+        abort(400, description="Invalid limit")
+    etag = collection_etag(cls, filters, limit, cursor)
+    if limit is None and cursor is None:
+        return conditional(etag, lambda: stream_json(
+            storage.stream(cls, **filters)))
+    after = decode_cursor(cursor) if cursor else None
+    # one extra object tells whether there is a next page
+    objs = list(storage.all(cls, limit=None if limit is None else limit + 1,
+                            after=after, **filters).values())
+    page = objs[:limit]
+    response = conditional(etag, lambda: stream_json(page))
+    if limit is not None and len(objs) > limit:
+        args = request.args.to_dict()
+        args['cursor'] = encode_cursor(objs[limit - 1])
+        response.headers['Link'] = '<{}?{}>; rel="next"'.format(
+            request.base_url, urlencode(args))
+    return response
@@ -8,6 +8,9 @@ from models.base_model import BaseModel
 from models.place import Place
 from models.city import City
 from models.user import User
+from api.v1.views.conditional import json_resource
+from api.v1.views.paging import paginate
+from api.v1.views.streaming import stream_json
 
 
 @app_views.route('/cities/<city_id>/places', methods=['GET'],
@@ -17,8 +20,7 @@ def get_places(city_id):
     city = storage.get(City, city_id)
     if city is None:
         abort(404)
-    places = [place.to_dict() for place in city.places]
-    return jsonify(places)
+    return paginate(Place, city_id=city.id)
 
 
 @app_views.route('/places/<place_id>', methods=['GET'], strict_slashes=False)
@@ -27,7 +29,7 @@ def get_place(place_id):
     place = storage.get(Place, place_id)
     if place is None:
         abort(404)
-    return jsonify(place.to_dict())
+    return json_resource(place)
 
 
 @app_views.route('/places/<place_id>', methods=['DELETE'],
@@ -80,5 +82,24 @@ def update_place(place_id):
     for key, value in data.items():
         if key not in ['id', 'user_id', 'city_id', 'created_at', 'updated_at']:
             setattr(place, key, value)
-    storage.save()
+    place.save()
     return jsonify(place.to_dict()), 200
+
+
+@app_views.route('/places_search', methods=['POST'], strict_slashes=False)
+def places_search():
+    """ Retrieves the Place objects in states or cities having amenities """
+    if not request.is_json:
+        abort(400, 'Not a JSON')
+    data = request.get_json()
+    if type(data) is not dict:
+        abort(400, 'Not a JSON')
+    for key in ['states', 'cities', 'amenities']:
+        ids = data.get(key)
+        if ids is not None and (type(ids) is not list or
+                                any(type(id) is not str for id in ids)):
+            abort(400, 'Invalid ' + key)
+    places = storage.places_search(data.get('states') or [],
+                                   data.get('cities') or [],
+                                   data.get('amenities') or [])
+    return stream_json(places.values())
@@ -8,6 +8,8 @@ from models.base_model import BaseModel
 from models.review import Review
 from models.place import Place
 from models.user import User
+from api.v1.views.conditional import json_resource
+from api.v1.views.paging import paginate
 
 
 @app_views.route('/places/<place_id>/reviews', methods=['GET'],
@@ -17,8 +19,7 @@ def get_reviews(place_id):
     place = storage.get(Place, place_id)
     if place is None:
         abort(404)
-    reviews = [review.to_dict() for review in place.reviews]
-    return jsonify(reviews)
+    return paginate(Review, place_id=place.id)
 
 
 @app_views.route('/reviews/<review_id>', methods=['GET'], strict_slashes=False)
@@ -27,7 +28,7 @@ def get_review(review_id):
     review = storage.get(Review, review_id)
     if review is None:
         abort(404)
-    return jsonify(review.to_dict())
+    return json_resource(review)
 
 
 @app_views.route('/reviews/<review_id>', methods=['DELETE'],
@@ -81,5 +82,5 @@ def update_review(review_id):
         if key not in ['id', 'user_id',
                        'place_id', 'created_at', 'updated_at']:
             setattr(review, key, value)
-    storage.save()
+    review.save()
     return jsonify(review.to_dict()), 200
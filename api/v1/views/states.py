@@ -6,13 +6,16 @@ from api.v1.views import app_views
 from models import storage
 from models.base_model import BaseModel
 from models.state import State
+from api.v1.views.cache import cached
+from api.v1.views.conditional import json_resource
+from api.v1.views.paging import paginate
 
 
 @app_views.route('/states', methods=['GET'], strict_slashes=False)
+@cached(State)
 def get_states():
     """Retrieves the list of all State objects"""
-    states = storage.all(State).values()
-    return jsonify([state.to_dict() for state in states])
+    return paginate(State)
 
 
 @app_views.route('/states/<state_id>', methods=['GET'], strict_slashes=False)
@@ -21,7 +24,7 @@ def get_state(state_id):
     state = storage.get(State, state_id)
     if state is None:
         abort(404)
-    return jsonify(state.to_dict())
+    return json_resource(state)
 
 
 @app_views.route('/states/<state_id>', methods=['DELETE'],
@@ -62,5 +65,5 @@ def update_state(state_id):
     for key, value in data.items():
         if key not in ignore:
             setattr(state, key, value)
-    storage.save()
+    state.save()
     return jsonify(state.to_dict()), 200
@@ -0,0 +1,30 @@
+#!/usr/bin/python3
+""" Streaming JSON responses for the collection views """
+
+from flask import current_app, Response, stream_with_context
+
+# number of objects encoded per chunk sent
+chunk_size = 100
+
+
+def stream_json(objs):
+    """returns a response encoding objs to a JSON list while it is sent"""
+    dumps = current_app.json.dumps
+
+    def generate():
+        """yields the JSON list of objs a chunk of objects at a time"""
+        yield "["
+        separator = ""
+        batch = []
+        for obj in objs:
+            batch.append(dumps(obj.to_dict()))
+            if len(batch) == chunk_size:
+                yield separator + ",".join(batch)
+                separator = ","
+                batch = []
+        if batch:
+            yield separator + ",".join(batch)
+        yield "]\n"
+
+    return Response(stream_with_context(generate()),
+                    mimetype=current_app.json.mimetype)
@@ -6,13 +6,14 @@ from api.v1.views import app_views
 from models import storage
 from models.base_model import BaseModel
 from models.user import User
+from api.v1.views.conditional import json_resource
+from api.v1.views.paging import paginate
 
 
 @app_views.route('/users', methods=['GET'], strict_slashes=False)
 def get_users():
     """Retrieves the list of all User objects"""
-    users = [user.to_dict() for user in storage.all(User).values()]
-    return jsonify(users)
+    return paginate(User)
 
 
 @app_views.route('/users/<user_id>', methods=['GET'], strict_slashes=False)
@@ -21,7 +22,7 @@ def get_user(user_id):
     user = storage.get(User, user_id)
     if user is None:
         abort(404)
-    return jsonify(user.to_dict())
+    return json_resource(user)
 
 
 @app_views.route('/users', methods=['POST'], strict_slashes=False)
@@ -0,0 +1,92 @@
+#!/usr/bin/python3
+"""
+Compares the threaded Flask server with the ASGI entry point (on uvicorn)
+under many concurrent clients:
+./benchmarks/api.py [concurrent clients] [requests] [path]
+"""
+
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+from time import perf_counter, sleep
+
+root = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+servers = {"threaded": "api.v1.app", "asgi": "api.v1.asgi"}
+
+
+def serve(module, port):
+    """starts the API server module on port and returns its process"""
+    env = dict(os.environ, HBNB_API_HOST="127.0.0.1", HBNB_API_PORT=str(port))
+    process = subprocess.Popen([sys.executable, "-m", module], cwd=root,
+                               env=env, stdout=subprocess.DEVNULL,
+                               stderr=subprocess.DEVNULL)
+    for _ in range(100):
+        if process.poll() is not None:
+            return None
+        try:
+            socket.create_connection(("127.0.0.1", port), 0.1).close()
+            return process
+        except OSError:
+            sleep(0.1)
+    process.kill()
+    return None
+
+
+async def fetch(port, path):
+    """returns the status of one GET of path, on a connection of its own"""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write("GET {} HTTP/1.1\r\nHost: localhost\r\n"
+                 "Connection: close\r\n\r\n".format(path).encode())
+    response = await reader.read()
+    writer.close()
+    return int(response.split(b" ", 2)[1])
+
+
+async def load(port, path, clients, total):
+    """returns the seconds, latencies and errors of total requests sent by
+    clients at once"""
+    latencies = []
+    errors = [0]
+    left = [total]
+
+    async def client():
+        """sends requests until total were sent"""
+        while left[0] > 0:
+            left[0] -= 1
+            start = perf_counter()
+            try:
+                if await asyncio.wait_for(fetch(port, path), 30) != 200:
+                    errors[0] += 1
+            except (OSError, IndexError, ValueError, asyncio.TimeoutError):
+                errors[0] += 1
+            latencies.append(perf_counter() - start)
+
+    start = perf_counter()
+    await asyncio.gather(*[client() for _ in range(clients)])
+    return perf_counter() - start, sorted(latencies), errors[0]
+
+
+if __name__ == "__main__":
+    clients = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    total = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+    path = sys.argv[3] if len(sys.argv) > 3 else "/api/v1/stats"
+    print("{} requests of {} from {} clients".format(total, path, clients))
+    for port, (name, module) in enumerate(servers.items(), 5100):
+        process = serve(module, port)
+        if process is None:
+            print("{:8} did not start (is uvicorn installed?)".format(name))
+            continue
+        try:
+            asyncio.run(load(port, path, clients, clients))
+            seconds, latencies, errors = asyncio.run(
+                load(port, path, clients, total))
+        finally:
+            process.terminate()
+            process.wait()
+        print("{:8} {:7.0f} req/s  p50 {:6.1f} ms  p99 {:6.1f} ms  "
+              "{} errors".format(name, total / seconds,
+                                 latencies[len(latencies) // 2] * 1e3,
+                                 latencies[len(latencies) * 99 // 100] * 1e3,
+                                 errors))
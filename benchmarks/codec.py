@@ -0,0 +1,31 @@
+#!/usr/bin/python3
+"""
+Times encoding and decoding a file.json sized store with every installed
+codec: ./benchmarks/codec.py [number of places]
+"""
+
+import sys
+from common import best, records
+
+
+def compare(count):
+    """prints the speed of every installed codec on count places"""
+    from models.engine import codec
+    jo = records(count)
+    size = len(codec.loaders["json"]()[1](jo))
+    print("{} places, {:.1f} MB".format(count, size / 1e6))
+    for name in codec.loaders:
+        try:
+            _, dumps, loads = codec.loaders[name]()
+        except ImportError:
+            print("{:8} not installed".format(name))
+            continue
+        data = dumps(jo)
+        encode = best(lambda: dumps(jo), 5)
+        decode = best(lambda: loads(data), 5)
+        print("{:8} encode {:7.1f} MB/s  decode {:7.1f} MB/s".format(
+            name, size / encode / 1e6, size / decode / 1e6))
+
+
+if __name__ == "__main__":
+    compare(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
@@ -0,0 +1,40 @@
+#!/usr/bin/python3
+"""
+Helpers shared by the benchmarks: the records of a store of places and
+the fastest of repeated runs, with the repository importable
+"""
+
+import gc
+import os
+import sys
+from time import perf_counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                ".."))
+
+
+def records(count):
+    """returns the to_dict records of count places, keyed like file.json"""
+    from models.place import Place
+    jo = {}
+    for i in range(count):
+        place = Place(city_id="city", user_id="user",
+                      name="Place {}".format(i),
+                      description="A nice place " * 5, number_rooms=i % 7,
+                      latitude=37.77 + i / 1e6, amenity_ids=["a", "b"])
+        jo["Place." + place.id] = place.to_dict()
+    return jo
+
+
+def best(func, repeat=3):
+    """returns the fastest of repeat runs of func, in seconds, collecting
+    garbage between the runs rather than during them"""
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        gc.disable()
+        start = perf_counter()
+        func()
+        times.append(perf_counter() - start)
+        gc.enable()
+    return min(times)
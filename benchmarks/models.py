@@ -0,0 +1,59 @@
+#!/usr/bin/python3
+"""
+Compares the memory FileStorage keeps for a store of places with the
+models holding their attributes in a __dict__ and in __slots__
+(HBNB_FILE_SLOTS=1): ./benchmarks/models.py [number of places]
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+
+def measure(count, path):
+    """returns the bytes kept by a FileStorage reloading count places"""
+    from models.base_model import BaseModel
+    from models.engine import snapshot
+    from models.engine.file_storage import FileStorage
+    from models.place import Place
+    jo = {}
+    for i in range(count):
+        place = Place(city_id="city {}".format(i % 100),
+                      user_id="user {}".format(i % 1000),
+                      name="Place {}".format(i), number_rooms=i % 7,
+                      latitude=37.77 + i / 1e6, amenity_ids=["a", "b"])
+        jo["Place." + place.id] = place.to_dict()
+    with open(path, 'wb') as f:
+        f.write(snapshot.encode(jo))
+    del jo, place
+    storage = FileStorage()
+    storage._FileStorage__file_path = path
+    storage._FileStorage__objects = {}
+    tracemalloc.start()
+    storage.reload()
+    records = tracemalloc.get_traced_memory()[0]
+    # what the objects alone take, the raw records being dropped
+    storage._FileStorage__records = {}
+    kept = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return kept, records
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    if len(sys.argv) > 2:
+        kept, records = measure(count, sys.argv[2])
+        print("{:7} {:7.1f} MB  {:5.0f} B/place  with records {:7.1f} MB"
+              .format("slots" if os.getenv("HBNB_FILE_SLOTS") == "1"
+                      else "dict", kept / 1e6, kept / count, records / 1e6))
+        sys.exit(0)
+    print("{} places".format(count))
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in ["0", "1"]:
+            env = dict(os.environ, HBNB_FILE_SLOTS=mode)
+            subprocess.run([sys.executable, __file__, str(count),
+                            os.path.join(tmp, "file.json")], env=env,
+                           cwd=tmp, check=True)
@@ -0,0 +1,62 @@
+#!/usr/bin/python3
+"""
+Compares the size, reload time and memory of the snapshot formats, with
+eager and lazy hydration, on a store of places:
+./benchmarks/snapshot.py [number of places]
+(HBNB_JSON_CODEC=json times JSON snapshots with the json module)
+"""
+
+import os
+import sys
+import tempfile
+import tracemalloc
+from common import best, records
+
+
+def reload(path, lazy=False):
+    """returns the seconds, peak bytes and kept bytes a FileStorage takes
+    to load path"""
+    from models.engine.file_storage import FileStorage
+    storage = FileStorage()
+    storage._FileStorage__file_path = path
+    storage._FileStorage__lazy = lazy
+
+    def run():
+        """reloads path into an empty store"""
+        storage._FileStorage__objects = {}
+        storage.reload()
+
+    seconds = best(run)
+    storage._FileStorage__objects = {}
+    tracemalloc.start()
+    storage.reload()
+    kept, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak, kept
+
+
+def compare(count):
+    """prints the size and load times of every format on count places"""
+    from models.engine import snapshot
+    jo = records(count)
+    print("{} places".format(count))
+    with tempfile.TemporaryDirectory() as tmp:
+        for format in snapshot.formats:
+            path = os.path.join(tmp, "file." + format)
+            with open(path, 'wb') as f:
+                f.write(snapshot.encode(jo, format, snapshot.foreign_keys))
+            with open(path, 'rb') as f:
+                data = f.read()
+            decode = best(lambda: snapshot.decode(data))
+            print("{:8} {:6.1f} MB  decode {:5.2f}s".format(
+                format, len(data) / 1e6, decode))
+            for lazy in [False, True]:
+                seconds, peak, kept = reload(path, lazy)
+                print("  {:5}  reload {:5.2f}s  peak {:6.1f} MB  "
+                      "kept {:6.1f} MB".format("lazy" if lazy else "eager",
+                                               seconds, peak / 1e6,
+                                               kept / 1e6))
+
+
+if __name__ == "__main__":
+    compare(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
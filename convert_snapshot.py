@@ -0,0 +1,15 @@
+#!/usr/bin/python3
+"""
+Converts a FileStorage snapshot between the JSON and msgpack formats:
+./convert_snapshot.py source destination [json|msgpack]
+"""
+
+import sys
+from models.engine import snapshot
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (3, 4):
+        print("usage: {} source destination [{}]".format(
+            sys.argv[0], "|".join(snapshot.formats)), file=sys.stderr)
+        sys.exit(1)
+    snapshot.convert(*sys.argv[1:])
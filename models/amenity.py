@@ -19,3 +19,11 @@ class Amenity(BaseModel, Base):
     def __init__(self, *args, **kwargs):
         """initializes Amenity"""
         super().__init__(*args, **kwargs)
+
+    if models.storage_t != 'db':
+        @property
+        def place_amenities(self):
+            """getter for list of place instances offering the amenity"""
+            from models.place import Place
+            return list(models.storage.all(Place,
+                                           amenity_ids=self.id).values())
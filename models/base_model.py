@@ -7,9 +7,11 @@ from datetime import datetime
 import models
 from os import getenv
 import sqlalchemy
+from types import MemberDescriptorType
 from sqlalchemy import Column, String, DateTime
 from sqlalchemy.ext.declarative import declarative_base
 import uuid
+import weakref
 
 time = "%Y-%m-%dT%H:%M:%S.%f"
 
@@ -18,13 +20,60 @@ if models.storage_t == "db":
 else:
     Base = object
 
+if models.storage_t != "db" and getenv("HBNB_CACHE_TO_DICT") == "1":
+    # to_dict() results by instance, dropped when an attribute is written
+    dicts = weakref.WeakKeyDictionary()
+else:
+    dicts = None
+
+# attributes held in __slots__ rather than in a __dict__ per instance
+slots = models.storage_t != "db" and getenv("HBNB_FILE_SLOTS") == "1"
+
+
+class Compact(type):
+    """metaclass turning the class attribute defaults of a model into
+    __slots__, the defaults being read by __getattr__ until set"""
+
+    def __new__(mcs, name, bases, namespace):
+        """returns the class with a slot for each of its defaults"""
+        defaults = {}
+        for base in bases:
+            defaults.update(getattr(base, "defaults", {}))
+        own = [attr for attr, value in namespace.items()
+               if not attr.startswith("__") and
+               type(value) in (str, int, float, list)]
+        for attr in own:
+            defaults[attr] = namespace.pop(attr)
+        namespace["__slots__"] = tuple(namespace.get("__slots__", ())) + \
+            tuple(own)
+        namespace["defaults"] = defaults
+        cls = super().__new__(mcs, name, bases, namespace)
+        # (name, slot) of each attribute, base class ones first
+        cls.members = [(attr, value) for klass in reversed(cls.__mro__)
+                       for attr, value in vars(klass).items()
+                       if type(value) is MemberDescriptorType and
+                       attr != "_BaseModel__extras"]
+        return cls
+
+
+def isoformat(dt):
+    """returns dt formatted with time, faster than strftime"""
+    if type(dt) is not datetime or dt.tzinfo is not None or dt.year < 1000:
+        return dt.strftime(time)
+    text = dt.isoformat()
+    return text if dt.microsecond else text + ".000000"
+
 
-class BaseModel:
+class BaseModel(metaclass=Compact if slots else type):
     """The BaseModel class from which future classes will be derived"""
     if models.storage_t == "db":
         id = Column(String(60), primary_key=True)
         created_at = Column(DateTime, default=datetime.utcnow)
         updated_at = Column(DateTime, default=datetime.utcnow)
+    elif slots:
+        # __extras holds the attributes no model declares, in a dict
+        __slots__ = ("id", "created_at", "updated_at", "__extras",
+                     "__weakref__")
 
     def __init__(self, *args, **kwargs):
         """Initialization of the base model"""
@@ -47,10 +96,88 @@ class BaseModel:
             self.created_at = datetime.utcnow()
             self.updated_at = self.created_at
 
+    @classmethod
+    def from_dict(cls, record):
+        """returns an instance rebuilt from a to_dict() record"""
+        if models.storage_t == "db":
+            return cls(**record)
+        obj = cls.__new__(cls)
+        if slots:
+            attrs = dict(record)
+        else:
+            # fill __dict__ directly, skipping __init__ and the setattr hook
+            attrs = obj.__dict__
+            attrs.update(record)
+        attrs.pop("__class__", None)
+        for key in ["created_at", "updated_at"]:
+            if type(attrs.get(key)) is str:
+                attrs[key] = datetime.fromisoformat(attrs[key])
+            else:
+                attrs[key] = datetime.utcnow()
+        if attrs.get("id") is None:
+            attrs["id"] = str(uuid.uuid4())
+        if slots:
+            for key, value in attrs.items():
+                obj.__store(key, value)
+        return obj
+
+    if models.storage_t != "db":
+        def __setattr__(self, name, value):
+            """sets an attribute and flags the instance for the next save"""
+            if slots:
+                self.__store(name, value)
+            else:
+                super().__setattr__(name, value)
+            if dicts is not None:
+                dicts.pop(self, None)
+            if getattr(self, "id", None) is not None and \
+                    hasattr(models, "storage"):
+                models.storage.touch(self)
+
+    if slots:
+        def __store(self, name, value):
+            """sets an attribute in its slot, or with the extras"""
+            try:
+                object.__setattr__(self, name, value)
+            except AttributeError:
+                if hasattr(type(self), name):
+                    raise
+                if self.__extras is None:
+                    object.__setattr__(self, "_BaseModel__extras", {})
+                self.__extras[name] = value
+
+        def __getattr__(self, name):
+            """returns an attribute no model declares, or the class default
+            of one never set"""
+            if name == "_BaseModel__extras":
+                return None
+            if self.__extras is not None and name in self.__extras:
+                return self.__extras[name]
+            try:
+                return type(self).defaults[name]
+            except KeyError:
+                raise AttributeError("{!r} object has no attribute {!r}"
+                                     .format(type(self).__name__, name)) \
+                    from None
+
+    def __attributes(self):
+        """returns the attributes set on the instance by name"""
+        if not slots:
+            return self.__dict__
+        found = {}
+        for attr, member in type(self).members:
+            try:
+                found[attr] = member.__get__(self)
+            except AttributeError:
+                pass
+        if self.__extras:
+            found.update(self.__extras)
+        return found
+
     def __str__(self):
         """String representation of the BaseModel class"""
         return "[{:s}] ({:s}) {}".format(self.__class__.__name__, self.id,
-                                         self.__dict__)
+                                         self.__attributes())
 
     def save(self):
         """updates the attribute 'updated_at' with the current datetime"""
@@ -60,14 +187,20 @@ class BaseModel:
 
     def to_dict(self):
         """returns a dictionary containing all keys/values of the instance"""
-        new_dict = self.__dict__.copy()
+        if dicts is not None:
+            new_dict = dicts.get(self)
+            if new_dict is not None:
+                return new_dict.copy()
+        new_dict = self.__attributes().copy()
         if "created_at" in new_dict:
-            new_dict["created_at"] = new_dict["created_at"].strftime(time)
+            new_dict["created_at"] = isoformat(new_dict["created_at"])
         if "updated_at" in new_dict:
-            new_dict["updated_at"] = new_dict["updated_at"].strftime(time)
+            new_dict["updated_at"] = isoformat(new_dict["updated_at"])
         new_dict["__class__"] = self.__class__.__name__
         if "_sa_instance_state" in new_dict:
             del new_dict["_sa_instance_state"]
+        if dicts is not None:
+            dicts[self] = new_dict.copy()
         return new_dict
 
     def delete(self):
@@ -0,0 +1,83 @@
+#!/usr/bin/python3
+"""
+JSON codec shared by the storage engines and the API, backed by orjson or
+msgspec when installed and by the json module otherwise
+"""
+
+import json
+from os import getenv
+
+
+def _load_orjson():
+    """returns the (name, dumps, loads) of the orjson codec"""
+    import orjson
+
+    def dumps(obj, sort_keys=False, default=None):
+        """returns the JSON string of obj"""
+        option = orjson.OPT_NON_STR_KEYS
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if default is not None:
+            # let default encode these the way the caller expects
+            option |= orjson.OPT_PASSTHROUGH_DATETIME | \
+                orjson.OPT_PASSTHROUGH_DATACLASS
+        return orjson.dumps(obj, default=default, option=option).decode()
+
+    return "orjson", dumps, orjson.loads
+
+
+def _load_msgspec():
+    """returns the (name, dumps, loads) of the msgspec codec"""
+    import msgspec
+
+    encoders = {}
+
+    def dumps(obj, sort_keys=False, default=None):
+        """returns the JSON string of obj"""
+        encoder = encoders.get((sort_keys, default))
+        if encoder is None:
+            encoder = msgspec.json.Encoder(
+                enc_hook=default, order="sorted" if sort_keys else None)
+            encoders[(sort_keys, default)] = encoder
+        return encoder.encode(obj).decode()
+
+    decoder = msgspec.json.Decoder()
+
+    def loads(data):
+        """returns the object decoded from the JSON data"""
+        try:
+            return decoder.decode(data)
+        except msgspec.DecodeError as e:
+            raise ValueError(str(e)) from e
+
+    return "msgspec", dumps, loads
+
+
+def _load_json():
+    """returns the (name, dumps, loads) of the json module codec"""
+
+    def dumps(obj, sort_keys=False, default=None):
+        """returns the JSON string of obj"""
+        return json.dumps(obj, sort_keys=sort_keys, default=default,
+                          separators=(",", ":"))
+
+    return "json", dumps, json.loads
+
+
+loaders = {"orjson": _load_orjson, "msgspec": _load_msgspec,
+           "json": _load_json}
+
+
+def load(preferred=None):
+    """returns the first installed codec, starting with preferred"""
+    order = ["orjson", "msgspec", "json"]
+    if preferred in loaders:
+        order.insert(0, preferred)
+    for name in order:
+        try:
+            return loaders[name]()
+        except ImportError:
+            pass
+
+
+name, dumps, loads = load(getenv('HBNB_JSON_CODEC'))
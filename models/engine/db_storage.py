@@ -11,19 +11,119 @@ from models.place import Place
 from models.review import Review
 from models.state import State
 from models.user import User
+from itertools import count
 from os import getenv
 import sqlalchemy
-from sqlalchemy import create_engine
-from sqlalchemy.orm import scoped_session, sessionmaker
+from sqlalchemy import and_, create_engine, distinct, func, literal, or_
+from sqlalchemy.orm import Session, joinedload, scoped_session, \
+    selectinload, sessionmaker, subqueryload
+from sqlalchemy.pool import QueuePool
+import threading
+from time import perf_counter
 
 classes = {"Amenity": Amenity, "City": City,
            "Place": Place, "Review": Review, "State": State, "User": User}
+# loader options of the HBNB_MYSQL_EAGER strategies
+loaders = {"selectin": selectinload, "joined": joinedload,
+           "subquery": subqueryload}
+
+
+class MeteredPool(QueuePool):
+    """QueuePool timing how long checkouts wait for a connection"""
+
+    def __init__(self, *args, **kwargs):
+        """Instantiate a MeteredPool"""
+        super().__init__(*args, **kwargs)
+        self.__guard = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_time = 0.0
+        self.max_wait = 0.0
+
+    def _do_get(self):
+        """returns a connection, waiting for one if the pool is exhausted"""
+        start = perf_counter()
+        timed_out = False
+        try:
+            return super()._do_get()
+        except sqlalchemy.exc.TimeoutError:
+            timed_out = True
+            raise
+        finally:
+            waited = perf_counter() - start
+            with self.__guard:
+                self.checkouts += 1
+                self.timeouts += timed_out
+                self.wait_time += waited
+                self.max_wait = max(self.max_wait, waited)
+
+
+class Replicas:
+    """replica engines handed out in turn or to the least loaded one"""
+
+    def __init__(self, engines, policy="round-robin"):
+        """Instantiate Replicas of engines picked by policy"""
+        if policy not in ("round-robin", "least-loaded"):
+            raise ValueError("unknown replica policy " + repr(policy))
+        self.engines = engines
+        self.policy = policy
+        self.__turn = count()
+
+    def pick(self):
+        """returns the replica engine to read from"""
+        start = next(self.__turn) % len(self.engines)
+        if self.policy == "round-robin":
+            return self.engines[start]
+        # scanning from the turn spreads ties round-robin
+        engines = self.engines[start:] + self.engines[:start]
+        return min(engines, key=lambda engine: engine.pool.checkedout())
+
+
+class RoutingSession(Session):
+    """session reading from a replica until it writes, then reading its
+    writes back from the primary"""
+
+    def __init__(self, replicas=None, **kwargs):
+        """Instantiate a RoutingSession reading from replicas"""
+        super().__init__(**kwargs)
+        self.replicas = replicas
+        self.replica = None
+        self.wrote = False
+
+    def flush(self, objects=None):
+        """flushes the changes to the primary"""
+        if self.new or self.deleted or self.dirty:
+            self.wrote = True
+        super().flush(objects)
+
+    def get_bind(self, mapper=None, **kwargs):
+        """returns the engine of the next statement"""
+        if not self.replicas or self.wrote or self.new or self.deleted:
+            return super().get_bind(mapper, **kwargs)
+        # one replica per session, so its reads agree with each other
+        if self.replica is None:
+            self.replica = self.replicas.pick()
+        return self.replica
+
+
+def pool_options():
+    """returns the create_engine() pool options set by HBNB_MYSQL_POOL_*"""
+    return {"poolclass": MeteredPool,
+            "pool_size": int(getenv('HBNB_MYSQL_POOL_SIZE', 5)),
+            "max_overflow": int(getenv('HBNB_MYSQL_MAX_OVERFLOW', 10)),
+            "pool_timeout": float(getenv('HBNB_MYSQL_POOL_TIMEOUT', 30)),
+            # below the server wait_timeout, which drops idle connections
+            "pool_recycle": int(getenv('HBNB_MYSQL_POOL_RECYCLE', 3600)),
+            # tests connections on checkout to replace the ones gone away
+            "pool_pre_ping": getenv('HBNB_MYSQL_POOL_PRE_PING', "1") == "1"}
 
 
 class DBStorage:
     """interaacts with the MySQL database"""
     __engine = None
+    __replicas = None
     __session = None
+    __listeners = []
 
     def __init__(self):
         """Instantiate a DBStorage object"""
@@ -36,48 +136,194 @@ class DBStorage:
                                       format(HBNB_MYSQL_USER,
                                              HBNB_MYSQL_PWD,
                                              HBNB_MYSQL_HOST,
-                                             HBNB_MYSQL_DB))
+                                             HBNB_MYSQL_DB),
+                                      **pool_options())
+        self.__eager = loaders[getenv('HBNB_MYSQL_EAGER', "selectin")]
+        hosts = getenv('HBNB_MYSQL_REPLICAS')
+        if hosts:
+            self.__replicas = Replicas(
+                [create_engine('mysql+mysqldb://{}:{}@{}/{}'.
+                               format(HBNB_MYSQL_USER, HBNB_MYSQL_PWD,
+                                      host.strip(), HBNB_MYSQL_DB),
+                               **pool_options())
+                 for host in hosts.split(",")],
+                getenv('HBNB_MYSQL_REPLICA_POLICY', "round-robin"))
         if HBNB_ENV == "test":
             Base.metadata.drop_all(self.__engine)
 
-    def all(self, cls=None):
-        """query on the current database session"""
+    def all(self, cls=None, limit=None, offset=0, after=None, load=(),
+            **filters):
+        """query on the current database session, loading the relationship
+        paths in load along with the objects"""
         new_dict = {}
         for clss in classes:
             if cls is None or cls is classes[clss] or cls is clss:
-                objs = self.__session.query(classes[clss]).all()
-                for obj in objs:
+                model = classes[clss]
+                query = self.__session.query(model)
+                if load:
+                    query = query.options(*self.__options(model, load))
+                if filters:
+                    query = query.filter_by(**filters)
+                if after is not None:
+                    created_at, id = after
+                    query = query.filter(or_(
+                        model.created_at > created_at,
+                        and_(model.created_at == created_at, model.id > id)))
+                if limit is not None or offset or after is not None:
+                    query = query.order_by(model.created_at, model.id)
+                if offset:
+                    # skip whole tables without loading their rows
+                    skipped = query.count()
+                    if skipped <= offset:
+                        offset -= skipped
+                        continue
+                    query = query.offset(offset)
+                    offset = 0
+                if limit is not None:
+                    query = query.limit(limit - len(new_dict))
+                for obj in query.all():
                     key = obj.__class__.__name__ + '.' + obj.id
                     new_dict[key] = obj
+                if limit is not None and len(new_dict) >= limit:
+                    break
         return (new_dict)
 
+    def stream(self, cls, batch=100, **filters):
+        """yields the objects of cls matching filters, fetching batch rows
+        of them at a time"""
+        if type(cls) is str:
+            cls = classes[cls]
+        yield from self.__session.query(cls).filter_by(**filters) \
+            .yield_per(batch)
+
     def new(self, obj):
         """add the object to the current database session"""
         self.__session.add(obj)
+        self.__changed(obj)
 
     def save(self):
         """commit all changes of the current database session"""
+        for obj in self.__session.dirty:
+            self.__changed(obj)
         self.__session.commit()
+        # told once committed, so a read in between is not kept as new
+        for name in self.__session.info.pop("changed", ()):
+            for callback in self.__listeners:
+                callback(name)
+
+    def refresh(self):
+        """nothing to pick up, every query reads the database"""
+        pass
+
+    def rollback(self):
+        """discards the changes of the current database session"""
+        self.__session.rollback()
+        self.__session.info.pop("changed", None)
 
     def delete(self, obj=None):
         """delete from the current database session obj if not None"""
         if obj is not None:
             self.__session.delete(obj)
+            self.__changed(obj)
+
+    def subscribe(self, callback):
+        """calls callback with the class name of each object changed"""
+        self.__listeners.append(callback)
+
+    def __changed(self, obj):
+        """keeps the class of obj for the listeners to be told on commit"""
+        self.__session.info.setdefault("changed", set()).add(
+            obj.__class__.__name__)
 
     def reload(self):
         """reloads data from the database"""
         Base.metadata.create_all(self.__engine)
-        sess_factory = sessionmaker(bind=self.__engine, expire_on_commit=False)
+        sess_factory = sessionmaker(bind=self.__engine, expire_on_commit=False,
+                                    class_=RoutingSession,
+                                    replicas=self.__replicas)
         Session = scoped_session(sess_factory)
         self.__session = Session
 
-    def get(self, cls, id):
-        """Retrieve one object"""
-        return self.__session.query(cls).get(id)
+    def get(self, cls, id, load=()):
+        """Retrieve one object, with the relationship paths in load"""
+        query = self.__session.query(cls)
+        if load:
+            query = query.options(*self.__options(cls, load))
+        return query.get(id)
+
+    def __options(self, model, load):
+        """returns the options eagerly loading the dotted relationship
+        paths in load that start from model"""
+        options = []
+        for path in load:
+            owner = model
+            option = None
+            for attr in path.split("."):
+                if not hasattr(owner, attr):
+                    break
+                relationship = getattr(owner, attr)
+                if option is None:
+                    option = self.__eager(relationship)
+                else:
+                    option = getattr(option, self.__eager.__name__)(
+                        relationship)
+                owner = relationship.property.mapper.class_
+            if option is not None:
+                options.append(option)
+        return options
 
     def count(self, cls=None):
         """Count the number of objects in storage"""
-        return len(self.all(cls))
+        if cls is None:
+            return sum(self.counts().values())
+        if type(cls) is str:
+            cls = classes[cls]
+        return self.__session.query(func.count(cls.id)).scalar()
+
+    def places_search(self, states=(), cities=(), amenities=()):
+        """returns the places in states or cities having all amenities"""
+        from models.place import place_amenity
+        query = self.__session.query(Place)
+        if states or cities:
+            query = query.join(City, Place.city_id == City.id).filter(
+                or_(City.state_id.in_(states), City.id.in_(cities)))
+        if amenities:
+            amenity_ids = set(amenities)
+            having = self.__session.query(place_amenity.c.place_id).filter(
+                place_amenity.c.amenity_id.in_(amenity_ids)).group_by(
+                place_amenity.c.place_id).having(
+                func.count(distinct(place_amenity.c.amenity_id)) ==
+                len(amenity_ids))
+            query = query.filter(Place.id.in_(having))
+        new_dict = {}
+        for obj in query.all():
+            new_dict[obj.__class__.__name__ + '.' + obj.id] = obj
+        return new_dict
+
+    def counts(self):
+        """Count the number of objects of each class in a single query"""
+        queries = [self.__session.query(literal(clss), func.count(cls.id))
+                   for clss, cls in classes.items()]
+        rows = queries[0].union_all(*queries[1:]).all()
+        return {clss: count for clss, count in rows}
+
+    def pool_stats(self):
+        """returns the metrics of the connection pools"""
+        stats = self.__pool_stats(self.__engine)
+        if self.__replicas is not None:
+            stats["replicas"] = [self.__pool_stats(engine)
+                                 for engine in self.__replicas.engines]
+        return stats
+
+    def __pool_stats(self, engine):
+        """returns the metrics of the connection pool of engine"""
+        pool = engine.pool
+        stats = {"size": pool.size(), "checked_in": pool.checkedin(),
+                 "checked_out": pool.checkedout(), "overflow": pool.overflow()}
+        if isinstance(pool, MeteredPool):
+            stats.update(checkouts=pool.checkouts, timeouts=pool.timeouts,
+                         wait_time=pool.wait_time, max_wait=pool.max_wait)
+        return stats
 
     def close(self):
         """call remove() method on the private session attribute"""
@@ -3,10 +3,16 @@
 Contains the FileStorage class
 """
 
-import json
+from bisect import bisect_left, bisect_right, insort
+import gc
+from itertools import islice
+import os
+from os import getenv
 from models.amenity import Amenity
 from models.base_model import BaseModel
 from models.city import City
+from models.engine import codec, snapshot
+from models.engine.locks import FileLock, RWLock
 from models.place import Place
 from models.review import Review
 from models.state import State
@@ -14,6 +20,8 @@ from models.user import User
 
 classes = {"Amenity": Amenity, "BaseModel": BaseModel, "City": City,
            "Place": Place, "Review": Review, "State": State, "User": User}
+# foreign keys indexed for relationship lookups
+indexed = snapshot.foreign_keys
 
 
 class FileStorage:
@@ -23,61 +31,631 @@ class FileStorage:
     __file_path = "file.json"
     # dictionary - empty but will store all objects by <class name>.id
     __objects = {}
+    # dictionary - objects of __objects bucketed by <class name>
+    __classes = {}
+    # dictionary - objects by (<class name>, foreign key, value)
+    __index = {}
+    # dictionary - (<class name>, foreign key, value) entries of each key
+    __indexed = {}
+    # dictionary - sorted (created_at, id) of each class, built on demand
+    __order = {}
+    # dictionary - (created_at, id) of each key as placed in __order
+    __sorted_as = {}
+    # dictionary - the __objects dictionary the indexes were built for
+    __index_of = None
+    # dictionary - objects modified since the last save, None when deleted
+    __dirty = {}
+    # dictionary - records not hydrated yet, by <class name> then key
+    __raw = {}
+    # dictionary - raw records last read from or written to __file_path
+    __records = {}
+    # tuple - stamps of the JSON file and journal when last read or written
+    __stamp = None
+    # list - callbacks told the <class name> of every object changed
+    __listeners = []
+    # RWLock - shared by the readers of the above, held alone to change them
+    __lock = RWLock()
+    # dictionary - FileLock of the processes sharing each file path
+    __file_locks = {}
+    # int - generation of the FileLock when the file was last read or written
+    __seen = None
 
-    def all(self, cls=None):
-        """returns the dictionary __objects"""
-        if cls is not None:
-            new_dict = {}
-            for key, value in self.__objects.items():
-                if cls == value.__class__ or cls == value.__class__.__name__:
-                    new_dict[key] = value
-            return new_dict
-        return self.__objects
+    def __init__(self):
+        """Instantiate a FileStorage object"""
+        self.__records = {}
+        self.__journal = getenv('HBNB_FILE_JOURNAL') == "1"
+        self.__compact_at = int(getenv('HBNB_FILE_COMPACT', 1000))
+        self.__format = getenv('HBNB_FILE_FORMAT', "json")
+        # indexed snapshots are mapped to be decoded a record at a time
+        self.__lazy = getenv('HBNB_FILE_LAZY') == "1" or \
+            self.__format == "indexed"
+        if self.__format not in snapshot.formats:
+            raise ValueError("unknown HBNB_FILE_FORMAT " + self.__format)
+        self.__pending = 0
+
+    def all(self, cls=None, limit=None, offset=0, after=None, load=(),
+            **filters):
+        """returns __objects, or a page of the objects matching filters;
+        relationships being index lookups, load has nothing to do"""
+        self.__catch_up()
+        if cls is None and not filters and limit is None and not offset \
+                and after is None:
+            if self.__raw:
+                with self.__lock.write():
+                    self.__hydrate()
+            return self.__objects
+        name = cls if cls is None or type(cls) is str else cls.__name__
+        paging = limit is not None or offset or after is not None
+        return self.__reading(True, name if paging else None, self.__select,
+                              name, limit, offset, after, filters)
+
+    def __reading(self, hydrates, order, func, *args):
+        """returns func(*args) under the shared lock, or under the writer
+        one if it would build the indexes, the order of class order, or
+        (when it hydrates) raw records"""
+        self.__catch_up()
+        with self.__lock.read():
+            if FileStorage.__index_of is self.__objects and \
+                    not (hydrates and self.__raw) and \
+                    (order is None or order in self.__order):
+                return func(*args)
+        with self.__lock.write():
+            return func(*args)
+
+    def __select(self, name, limit, offset, after, filters):
+        """returns a page of the objects of class name matching filters"""
+        self.__sync()
+        if self.__raw:
+            # hydrate only the records the indexes below would yield
+            attr = next((attr for attr in filters if attr in indexed), None)
+            if name is None or attr is None or limit is not None or \
+                    offset or after is not None:
+                self.__hydrate(name)
+            else:
+                self.__hydrate(name, attr, {filters[attr]})
+        found = self.__objects
+        if name is not None:
+            found = self.__classes.get(name, {})
+            for attr, value in filters.items():
+                if attr in indexed:
+                    found = self.__index.get((name, attr, value), {})
+                    break
+        if limit is not None or offset or after is not None:
+            items = self.__ordered(name, found, after)
+        else:
+            items = found.items()
+        matches = (item for item in items
+                   if self.__matches(item[1], name, filters))
+        stop = None if limit is None else offset + limit
+        return dict(islice(matches, offset, stop))
+
+    def stream(self, cls, batch=100, **filters):
+        """yields the objects of cls matching filters, building them out of
+        their raw records batch objects at a time"""
+        name = cls if type(cls) is str else cls.__name__
+        keys = self.__reading(False, None, self.__keys, name, filters)
+        for start in range(0, len(keys), batch):
+            yield from self.__reading(True, None, self.__batch, name,
+                                      keys[start:start + batch], filters)
+
+    def __keys(self, name, filters):
+        """returns the keys of the objects and raw records of class name
+        that may match filters"""
+        self.__sync()
+        found = self.__classes.get(name, {})
+        raw = self.__raw.get(name, {})
+        attr = next((attr for attr in filters if attr in indexed), None)
+        if attr is not None:
+            found = self.__index.get((name, attr, filters[attr]), {})
+            raw = [key for key, record in raw.items()
+                   if record.get(attr) == filters[attr] or
+                   type(record.get(attr)) is list and
+                   filters[attr] in record.get(attr)]
+        return list(found) + list(raw)
+
+    def __batch(self, name, keys, filters):
+        """returns the objects of keys matching filters, built out of their
+        raw records when they have not been yet"""
+        self.__sync()
+        objs = []
+        for key in keys:
+            obj = self.__objects.get(key)
+            if obj is None and self.__raw:
+                record = self.__unraw(key)
+                if record is not None:
+                    obj = classes[name].from_dict(snapshot.plain(record))
+                    self.__place(key, obj)
+            if obj is not None and self.__matches(obj, name, filters):
+                objs.append(obj)
+        return objs
+
+    def __ordered(self, name, found, after):
+        """returns the items of found by (created_at, id) after a cursor"""
+        if name is not None and found is self.__classes.get(name):
+            order = self.__order.get(name)
+            if order is None:
+                order = sorted((obj.created_at, obj.id)
+                               for obj in found.values())
+                self.__order[name] = order
+                for sort_key in order:
+                    self.__sorted_as[name + "." + sort_key[1]] = sort_key
+            start = 0 if after is None else bisect_right(order, tuple(after))
+            keys = (name + "." + sort_key[1]
+                    for sort_key in islice(order, start, None))
+            return ((key, found[key]) for key in keys)
+        items = sorted(found.items(),
+                       key=lambda item: (item[1].created_at, item[1].id))
+        if after is not None:
+            items = [item for item in items
+                     if (item[1].created_at, item[1].id) > tuple(after)]
+        return items
+
+    def __hydrate(self, name=None, attr=None, values=None):
+        """builds the objects of the raw records of class name, or of all
+        classes, whose attr is (or has one of) the values"""
+        self.__sync()
+        for clss in [name] if name is not None else list(self.__raw):
+            raw = self.__raw.get(clss, {})
+            if attr is None:
+                keys = list(raw)
+            else:
+                keys = []
+                for key, record in raw.items():
+                    have = record.get(attr)
+                    if type(have) is list:
+                        if any(type(value) is str and value in values
+                               for value in have):
+                            keys.append(key)
+                    elif type(have) is str and have in values:
+                        keys.append(key)
+            for key in keys:
+                self.__place(key, classes[clss].from_dict(
+                    snapshot.plain(raw.pop(key))))
+            if not raw:
+                self.__raw.pop(clss, None)
+
+    def __defer(self, key, record):
+        """keeps record raw until its object is needed"""
+        self.__sync()
+        name = key.split(".", 1)[0]
+        if key in self.__objects:
+            self.__drop(key)
+        else:
+            self.__notify(name)
+        self.__raw.setdefault(name, {})[key] = record
+
+    def __unraw(self, key):
+        """removes and returns the raw record of key, None if there is none"""
+        name = key.split(".", 1)[0]
+        raw = self.__raw.get(name)
+        record = None if raw is None else raw.pop(key, None)
+        if raw is not None and not raw:
+            del self.__raw[name]
+        return record
+
+    def __matches(self, obj, name, filters):
+        """tells if obj is of class name and has the filters values"""
+        if name is not None and obj.__class__.__name__ != name:
+            return False
+        for attr, value in filters.items():
+            # a list attribute matches when it contains the value
+            have = getattr(obj, attr, None)
+            if have != value and not (type(have) is list and value in have):
+                return False
+        return True
 
     def new(self, obj):
         """sets in __objects the obj with key <obj class name>.id"""
         if obj is not None:
             key = obj.__class__.__name__ + "." + obj.id
-            self.__objects[key] = obj
+            with self.__lock.write():
+                if self.__raw:
+                    self.__unraw(key)
+                self.__put(key, obj)
+                self.__dirty[key] = obj
+
+    def touch(self, obj):
+        """flags obj as modified if it is the one held in __objects"""
+        key = obj.__class__.__name__ + "." + obj.id
+        # most objects written to are not stored yet, skip the lock
+        if self.__objects.get(key) is obj:
+            with self.__lock.write():
+                if self.__objects.get(key) is obj:
+                    self.__put(key, obj)
+                    self.__dirty[key] = obj
+
+    def subscribe(self, callback):
+        """calls callback with the class name of each object changed"""
+        with self.__lock.write():
+            self.__listeners.append(callback)
+
+    def __sync(self):
+        """rebuilds the indexes if __objects was replaced"""
+        if FileStorage.__index_of is not self.__objects:
+            FileStorage.__index_of = self.__objects
+            self.__classes.clear()
+            self.__index.clear()
+            self.__indexed.clear()
+            self.__order.clear()
+            self.__sorted_as.clear()
+            # raw records belonged to the __objects replaced
+            self.__raw.clear()
+            for key, obj in self.__objects.items():
+                self.__add(key, obj)
+
+    def __notify(self, name):
+        """tells the listeners that an object of class name changed"""
+        for callback in self.__listeners:
+            callback(name)
+
+    def __put(self, key, obj):
+        """stores obj under key in __objects and the indexes"""
+        self.__place(key, obj)
+        self.__notify(obj.__class__.__name__)
+
+    def __place(self, key, obj):
+        """stores obj under key without telling the listeners"""
+        self.__sync()
+        name = obj.__class__.__name__
+        entries = self.__entries(name, obj)
+        if key in self.__objects and \
+                set(entries) == set(self.__indexed.get(key, ())):
+            # same index entries, replaced in place to keep listing order
+            self.__classes[name][key] = obj
+            for entry in entries:
+                self.__index[entry][key] = obj
+        else:
+            if key in self.__objects:
+                self.__remove(key)
+            self.__add(key, obj, entries)
+        self.__objects[key] = obj
+        sort_key = (obj.created_at, obj.id)
+        order = self.__order.get(obj.__class__.__name__)
+        if order is not None and self.__sorted_as.get(key) != sort_key:
+            if key in self.__sorted_as:
+                del order[bisect_left(order, self.__sorted_as[key])]
+            insort(order, sort_key)
+            self.__sorted_as[key] = sort_key
+
+    def __drop(self, key):
+        """removes key from __objects and the indexes"""
+        self.__sync()
+        if key in self.__objects:
+            self.__remove(key)
+            del self.__objects[key]
+            name = key.split(".", 1)[0]
+            order = self.__order.get(name)
+            if order is not None:
+                del order[bisect_left(order, self.__sorted_as.pop(key))]
+            self.__notify(name)
+
+    def __entries(self, name, obj):
+        """returns the foreign key index entries of obj of class name"""
+        entries = []
+        for attr in indexed:
+            value = getattr(obj, attr, None)
+            # foreign keys are str ids, clients may set anything else
+            for value in {value for value in
+                          (value if type(value) is list else [value])
+                          if type(value) is str}:
+                entries.append((name, attr, value))
+        return entries
+
+    def __add(self, key, obj, entries=None):
+        """adds obj to its class bucket and foreign key indexes"""
+        name = obj.__class__.__name__
+        self.__classes.setdefault(name, {})[key] = obj
+        if entries is None:
+            entries = self.__entries(name, obj)
+        for entry in entries:
+            self.__index.setdefault(entry, {})[key] = obj
+        self.__indexed[key] = entries
+
+    def __remove(self, key):
+        """removes key from its class bucket and foreign key indexes"""
+        name = key.split(".", 1)[0]
+        self.__classes[name].pop(key, None)
+        for entry in self.__indexed.pop(key, []):
+            bucket = self.__index[entry]
+            del bucket[key]
+            if not bucket:
+                del self.__index[entry]
 
     def save(self):
         """serializes __objects to the JSON file (path: __file_path)"""
+        with self.__lock.write(), self.__file_lock().write():
+            # merge what other processes saved, the changes made here win
+            if self.__stale():
+                self.__refresh()
+            if not self.__journal:
+                self.__compact()
+                return
+            if not self.__dirty:
+                return
+            lines = []
+            for key, obj in self.__dirty.items():
+                record = obj.to_dict() if obj is not None else None
+                lines.append(codec.dumps({"key": key, "value": record}) + "\n")
+                if record is None:
+                    self.__records.pop(key, None)
+                else:
+                    self.__records[key] = record
+            self.__dirty.clear()
+            with open(self.__file_path + ".journal", 'a') as f:
+                f.write("".join(lines))
+                f.flush()
+                os.fsync(f.fileno())
+            self.__pending += len(lines)
+            if self.__pending >= self.__compact_at:
+                self.__compact()
+            else:
+                self.__stamp = self.__stamps()
+                self.__seen = self.__file_lock().bump()
+
+    def rollback(self):
+        """discards the changes made since the last save"""
+        with self.__lock.write():
+            for key in list(self.__dirty):
+                record = self.__records.get(key)
+                if record is None:
+                    self.__drop(key)
+                else:
+                    record = snapshot.plain(record)
+                    self.__put(key, classes[record["__class__"]]
+                               .from_dict(record))
+            self.__dirty.clear()
+
+    def __compact(self):
+        """writes __objects as a new snapshot and discards the journal"""
         json_objects = {}
+        for raw in self.__raw.values():
+            json_objects.update(raw)
         for key in self.__objects:
             json_objects[key] = self.__objects[key].to_dict()
-        with open(self.__file_path, 'w') as f:
-            json.dump(json_objects, f)
+        tmp_path = self.__file_path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(snapshot.encode(json_objects, self.__format, indexed))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.__file_path)
+        try:
+            os.remove(self.__file_path + ".journal")
+        except FileNotFoundError:
+            pass
+        if self.__format == "indexed":
+            # point the records left encoded at the new file
+            json_objects = snapshot.load(self.__file_path)
+            for raw in self.__raw.values():
+                for key in raw:
+                    raw[key] = json_objects[key]
+        self.__dirty.clear()
+        self.__records = json_objects
+        self.__pending = 0
+        self.__stamp = self.__stamps()
+        self.__seen = self.__file_lock().bump()
 
     def reload(self):
-        """deserializes the JSON file to __objects"""
+        """deserializes the JSON or msgpack snapshot to __objects"""
+        with self.__lock.write(), self.__file_lock().read():
+            # every object built here is kept, collecting cycles is wasted work
+            enabled = gc.isenabled()
+            gc.disable()
+            try:
+                stamp = self.__stamps()
+                seen = self.__file_lock().generation()
+                jo = self.__read()
+                # sorting once on demand beats inserting every object in order
+                self.__order.clear()
+                self.__sorted_as.clear()
+                for key in jo:
+                    if self.__lazy:
+                        self.__defer(key, jo[key])
+                    else:
+                        record = snapshot.plain(jo[key])
+                        self.__put(key, classes[record["__class__"]]
+                                   .from_dict(record))
+                    self.__dirty.pop(key, None)
+                self.__records = jo
+                self.__stamp = stamp
+                self.__seen = seen
+            finally:
+                if enabled:
+                    gc.enable()
+
+    def __read(self):
+        """returns the records of the JSON file with the journal replayed"""
         try:
-            with open(self.__file_path, 'r') as f:
-                jo = json.load(f)
-            for key in jo:
-                self.__objects[key] = classes[jo[key]["__class__"]](**jo[key])
+            jo = snapshot.load(self.__file_path)
+        except FileNotFoundError:
+            jo = {}
+        self.__pending = 0
+        journal_path = self.__file_path + ".journal"
+        try:
+            with open(journal_path, 'rb') as f:
+                good = 0
+                for line in f:
+                    try:
+                        if not line.endswith(b"\n"):
+                            raise ValueError("torn journal record")
+                        entry = codec.loads(line)
+                    except ValueError:
+                        # drop a record half-written by a crash
+                        os.truncate(journal_path, good)
+                        break
+                    if entry["value"] is None:
+                        jo.pop(entry["key"], None)
+                    else:
+                        jo[entry["key"]] = entry["value"]
+                    good += len(line)
+                    self.__pending += 1
         except FileNotFoundError:
             pass
+        return jo
+
+    def __stat(self, path):
+        """returns the (inode, mtime, size) stamp of path"""
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def __stamps(self):
+        """returns the stamps of the JSON file and its journal"""
+        return (self.__stat(self.__file_path),
+                self.__stat(self.__file_path + ".journal"))
+
+    def __file_lock(self):
+        """returns the FileLock of __file_path"""
+        file_lock = self.__file_locks.get(self.__file_path)
+        if file_lock is None:
+            file_lock = self.__file_locks.setdefault(
+                self.__file_path, FileLock(self.__file_path + ".lock"))
+        return file_lock
+
+    def __stale(self):
+        """tells if the JSON file changed since it was last read or written"""
+        return self.__seen != self.__file_lock().generation() or \
+            self.__stamps() != self.__stamp
+
+    def refresh(self):
+        """picks up the objects other processes saved since the last read"""
+        self.__catch_up()
+
+    def __catch_up(self):
+        """refreshes __objects if another process saved since it was read"""
+        # comparing the generations costs no system call
+        if self.__seen is not None and \
+                self.__seen != self.__file_lock().generation():
+            with self.__lock.write(), self.__file_lock().read():
+                if self.__seen != self.__file_lock().generation():
+                    self.__refresh()
+
+    def __refresh(self):
+        """rebuilds only the objects whose record changed on disk, keeping
+        the ones changed here and not saved yet"""
+        stamp = self.__stamps()
+        seen = self.__file_lock().generation()
+        jo = self.__read()
+        for key, record in jo.items():
+            if key in self.__dirty:
+                continue
+            if self.__records.get(key) == record and \
+                    (key in self.__objects or
+                     key in self.__raw.get(key.split(".", 1)[0], ())):
+                continue
+            if self.__lazy:
+                self.__defer(key, record)
+            else:
+                record = snapshot.plain(record)
+                self.__put(key, classes[record["__class__"]]
+                           .from_dict(record))
+            self.__dirty.pop(key, None)
+        for key in self.__records:
+            if key not in jo and key not in self.__dirty:
+                if self.__raw and self.__unraw(key) is not None:
+                    self.__notify(key.split(".", 1)[0])
+                else:
+                    self.__drop(key)
+        self.__records = jo
+        self.__stamp = stamp
+        self.__seen = seen
 
     def delete(self, obj=None):
         """delete obj from __objects if it’s inside"""
-        if obj is not None:
-            key = obj.__class__.__name__ + '.' + obj.id
-            if key in self.__objects:
-                del self.__objects[key]
+        with self.__lock.write():
+            if obj is not None:
+                key = obj.__class__.__name__ + '.' + obj.id
+                if key in self.__objects:
+                    self.__drop(key)
+                    self.__dirty[key] = None
+                elif self.__raw and self.__unraw(key) is not None:
+                    self.__notify(obj.__class__.__name__)
+                    self.__dirty[key] = None
 
-    def get(self, cls, id):
+    def get(self, cls, id, load=()):
         """Retrieve one object"""
+        self.__catch_up()
         key = "{}.{}".format(cls.__name__, id)
-        return self.__objects.get(key, None)
+        # a single lookup needs no lock, dict operations being atomic
+        obj = self.__objects.get(key, None)
+        if obj is None and self.__raw:
+            with self.__lock.write():
+                obj = self.__objects.get(key, None)
+                record = self.__unraw(key) if obj is None else None
+                if record is not None:
+                    record = snapshot.plain(record)
+                    obj = classes[record["__class__"]].from_dict(record)
+                    self.__place(key, obj)
+        return obj
 
     def count(self, cls=None):
         """Count the number of objects in storage"""
+        return self.__reading(False, None, self.__count, cls)
+
+    def __count(self, cls):
+        """returns the number of objects of cls, or of all classes"""
         if cls:
-            return len([obj for obj in self.__objects.values()
-                        if obj.__class__ == cls])
+            self.__sync()
+            name = cls if type(cls) is str else cls.__name__
+            return len(self.__classes.get(name, {})) + \
+                len(self.__raw.get(name, {}))
         else:
-            return len(self.__objects)
+            return len(self.__objects) + \
+                sum(len(raw) for raw in self.__raw.values())
+
+    def places_search(self, states=(), cities=(), amenities=()):
+        """returns the places in states or cities having all amenities"""
+        return self.__reading(True, None, self.__search, states, cities,
+                              amenities)
+
+    def __search(self, states, cities, amenities):
+        """returns the places_search() results"""
+        self.__sync()
+        found = None
+        if states or cities:
+            city_ids = set(cities)
+            if self.__raw and states:
+                self.__hydrate("City", "state_id", set(states))
+            for state_id in states:
+                in_state = self.__index.get(("City", "state_id", state_id), {})
+                city_ids.update(city.id for city in in_state.values())
+            if self.__raw:
+                self.__hydrate("Place", "city_id", city_ids)
+            found = {}
+            for city_id in city_ids:
+                found.update(self.__index.get(("Place", "city_id", city_id),
+                                              {}))
+        elif self.__raw:
+            # a place having every amenity has the first one
+            first = set(list(amenities)[:1])
+            self.__hydrate("Place", "amenity_ids" if first else None, first)
+        offering = [self.__index.get(("Place", "amenity_ids", amenity_id), {})
+                    for amenity_id in set(amenities)]
+        # intersect the smallest sets first
+        for having in sorted(offering, key=len):
+            if found is None:
+                found = dict(having)
+            else:
+                found = {key: obj for key, obj in found.items()
+                         if key in having}
+        if found is None:
+            found = dict(self.__classes.get("Place", {}))
+        return found
+
+    def counts(self):
+        """Count the number of objects of each class in storage"""
+        return self.__reading(False, None, self.__counts)
+
+    def __counts(self):
+        """returns the number of objects of each class"""
+        self.__sync()
+        return {name: len(self.__classes.get(name, {})) +
+                len(self.__raw.get(name, {})) for name in classes}
 
     def close(self):
-        """call reload() method for deserializing the JSON file to objects"""
-        self.reload()
+        """refresh __objects from the JSON file if it changed on disk"""
+        if self.__stale():
+            with self.__lock.write(), self.__file_lock().read():
+                if self.__stale():
+                    self.__refresh()
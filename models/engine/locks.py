@@ -0,0 +1,152 @@
+#!/usr/bin/python3
+"""
+Contains the RWLock and FileLock classes
+"""
+
+from contextlib import contextmanager
+import fcntl
+import mmap
+import os
+import struct
+import threading
+
+
+class RWLock:
+    """lock held by any number of readers or by a single writer, a waiting
+    writer keeping new readers out"""
+
+    def __init__(self):
+        """Instantiate a RWLock"""
+        self.__cond = threading.Condition(threading.Lock())
+        self.__readers = 0
+        self.__waiting = 0
+        self.__writer = None
+        self.__writes = 0
+        self.__local = threading.local()
+
+    @contextmanager
+    def read(self):
+        """holds the lock shared with the other readers"""
+        if self.__writer == threading.get_ident():
+            # the writer may read what it writes
+            yield
+            return
+        reads = getattr(self.__local, "reads", 0)
+        with self.__cond:
+            # a thread already reading must not wait for a writer waiting
+            # on it
+            while not reads and (self.__writer is not None or
+                                 self.__waiting):
+                self.__cond.wait()
+            self.__readers += 1
+        self.__local.reads = reads + 1
+        try:
+            yield
+        finally:
+            self.__local.reads = reads
+            with self.__cond:
+                self.__readers -= 1
+                if not self.__readers:
+                    self.__cond.notify_all()
+
+    @contextmanager
+    def write(self):
+        """holds the lock alone, again if this thread already does"""
+        me = threading.get_ident()
+        with self.__cond:
+            if self.__writer == me:
+                self.__writes += 1
+            else:
+                if getattr(self.__local, "reads", 0):
+                    raise RuntimeError("cannot write while reading")
+                self.__waiting += 1
+                while self.__writer is not None or self.__readers:
+                    self.__cond.wait()
+                self.__waiting -= 1
+                self.__writer = me
+                self.__writes = 1
+        try:
+            yield
+        finally:
+            with self.__cond:
+                self.__writes -= 1
+                if not self.__writes:
+                    self.__writer = None
+                    self.__cond.notify_all()
+
+
+class FileLock:
+    """advisory lock of the processes sharing a file, counting the times
+    they wrote to it; the threads of a process take it under their RWLock
+    writer one"""
+
+    def __init__(self, path):
+        """Instantiate a FileLock kept in the lock file at path"""
+        self.__path = path
+        self.__guard = threading.Lock()
+        self.__fd = None
+        self.__map = None
+        self.__depth = 0
+        self.__shared = False
+
+    def __open(self):
+        """opens and maps the lock file, again if it was replaced"""
+        with self.__guard:
+            if self.__fd is not None:
+                try:
+                    if os.stat(self.__path).st_ino == \
+                            os.fstat(self.__fd).st_ino:
+                        return
+                except FileNotFoundError:
+                    pass
+                os.close(self.__fd)
+            fd = os.open(self.__path, os.O_RDWR | os.O_CREAT, 0o644)
+            # growing the file keeps the generation another process wrote
+            if os.fstat(fd).st_size < 8:
+                os.ftruncate(fd, 8)
+            self.__map = mmap.mmap(fd, 8)
+            self.__fd = fd
+
+    @contextmanager
+    def __hold(self, shared):
+        """holds the lock shared or alone, again if already held"""
+        if self.__depth:
+            if self.__shared and not shared:
+                raise RuntimeError("cannot write while reading")
+            self.__depth += 1
+            try:
+                yield
+            finally:
+                self.__depth -= 1
+            return
+        self.__open()
+        fcntl.flock(self.__fd, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        self.__depth = 1
+        self.__shared = shared
+        try:
+            yield
+        finally:
+            self.__depth = 0
+            fcntl.flock(self.__fd, fcntl.LOCK_UN)
+
+    def read(self):
+        """holds the lock shared with the other readers"""
+        return self.__hold(True)
+
+    def write(self):
+        """holds the lock alone"""
+        return self.__hold(False)
+
+    def generation(self):
+        """returns the number of writes counted, read without locking"""
+        if self.__map is None:
+            self.__open()
+        return struct.unpack_from("=Q", self.__map)[0]
+
+    def bump(self):
+        """counts one more write and returns the new generation"""
+        if not self.__depth or self.__shared:
+            raise RuntimeError("cannot count a write without writing")
+        generation = self.generation() + 1
+        struct.pack_into("=Q", self.__map, 0, generation)
+        return generation
@@ -0,0 +1,155 @@
+#!/usr/bin/python3
+"""
+Snapshot formats of FileStorage: a JSON object of the records keyed by
+<class name>.id, msgpack tables of the records grouped per class, or JSON
+lines indexed by byte offset, read through a memory map
+"""
+
+import mmap
+import sys
+from models.engine import codec
+
+formats = ("json", "msgpack", "indexed")
+# header of msgpack snapshots, JSON ones start with "{"
+magic = b"HBNB\x01"
+# header of indexed snapshots
+indexed_magic = b"HBNB\x02\n"
+# foreign keys kept in the index of indexed snapshots for relationship lookups
+foreign_keys = ("state_id", "city_id", "place_id", "user_id", "amenity_ids")
+
+
+class Span:
+    """a record left encoded in the memory map of an indexed snapshot"""
+    __slots__ = ("data", "start", "stop", "fields")
+
+    def __init__(self, data, start, stop, fields=None):
+        """Instantiate a Span of data[start:stop] with its indexed fields"""
+        self.data = data
+        self.start = start
+        self.stop = stop
+        self.fields = fields
+
+    def get(self, attr, default=None):
+        """returns the value of the indexed field attr"""
+        if self.fields is None:
+            return default
+        return self.fields.get(attr, default)
+
+    def raw(self):
+        """returns the encoded record"""
+        return self.data[self.start:self.stop]
+
+    def decode(self):
+        """returns the record"""
+        return codec.loads(self.data[self.start:self.stop])
+
+    def __eq__(self, other):
+        """tells if other holds the same record"""
+        if type(other) is Span:
+            return self.raw() == other.raw()
+        return self.decode() == other
+
+
+def plain(record):
+    """returns record, decoded if it is a Span"""
+    return record.decode() if type(record) is Span else record
+
+
+def encode(records, format="json", fields=()):
+    """returns the bytes of records in format, indexed snapshots copying
+    the fields listed to their index"""
+    if format == "indexed":
+        return encode_indexed(records, fields)
+    records = {key: plain(record) for key, record in records.items()}
+    if format == "json":
+        return codec.dumps(records).encode()
+    if format != "msgpack":
+        raise ValueError("unknown snapshot format " + repr(format))
+    import msgpack
+    # class name: {attribute names: rows of the records having them}
+    tables = {}
+    for record in records.values():
+        # objects of a class share a few attribute lists, stored once
+        attrs = tuple(attr for attr in record if attr != "__class__")
+        tables.setdefault(record["__class__"], {}).setdefault(
+            attrs, []).append([record[attr] for attr in attrs])
+    return magic + msgpack.packb(
+        {name: [[list(attrs), rows] for attrs, rows in groups.items()]
+         for name, groups in tables.items()})
+
+
+def encode_indexed(records, fields=()):
+    """returns the bytes of records as an indexed snapshot: one JSON record
+    per line, the index of their offsets, and the offset of the index"""
+    parts = [indexed_magic]
+    at = len(indexed_magic)
+    index = {}
+    for key, record in records.items():
+        if type(record) is Span:
+            # copied as is, without decoding it
+            line = record.raw()
+            have = record.fields
+        else:
+            line = codec.dumps(record).encode()
+            have = {attr: record[attr] for attr in fields
+                    if record.get(attr) is not None}
+        index[key] = [at, len(line), have] if have else [at, len(line)]
+        parts.append(line)
+        parts.append(b"\n")
+        at += len(line) + 1
+    parts.append(codec.dumps(index).encode())
+    parts.append("\n{}\n".format(at).encode())
+    return b"".join(parts)
+
+
+def spans(data):
+    """returns a Span of each record of the indexed snapshot data"""
+    end = data.rfind(b"\n", 0, len(data) - 1)
+    index = codec.loads(data[int(data[end + 1:]):end])
+    return {key: Span(data, entry[0], entry[0] + entry[1],
+                      entry[2] if len(entry) > 2 else None)
+            for key, entry in index.items()}
+
+
+def decode(data):
+    """returns the records of the snapshot data, in any format"""
+    if data.startswith(indexed_magic):
+        return {key: span.decode() for key, span in spans(data).items()}
+    if not data.startswith(magic):
+        return codec.loads(data)
+    import msgpack
+    records = {}
+    tables = msgpack.unpackb(memoryview(data)[len(magic):])
+    for name, groups in tables.items():
+        for attrs, rows in groups:
+            # interned like the attribute names in the code reading them
+            attrs = [sys.intern(attr) for attr in attrs]
+            at = attrs.index("id")
+            for row in rows:
+                record = dict(zip(attrs, row))
+                record["__class__"] = name
+                records[name + "." + row[at]] = record
+    return records
+
+
+def load(path):
+    """returns the records of the snapshot at path, as Spans of a memory
+    map shared with other processes if it is indexed"""
+    with open(path, 'rb') as f:
+        if f.read(len(indexed_magic)) != indexed_magic:
+            f.seek(0)
+            return decode(f.read())
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return spans(data)
+
+
+def convert(source, destination, format=None):
+    """writes the snapshot source to destination in format, by default
+    msgpack for a JSON one and JSON otherwise; indexed snapshots keep the
+    foreign keys in their index, as FileStorage saves them"""
+    with open(source, 'rb') as f:
+        data = f.read()
+    if format is None:
+        format = "msgpack" if data.startswith(b"{") else "json"
+    with open(destination, 'wb') as f:
+        f.write(encode(decode(data), format, foreign_keys))
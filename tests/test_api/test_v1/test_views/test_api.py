@@ -1,9 +1,19 @@
 #!/usr/bin/python3
 ''' Test for App '''
+from base64 import urlsafe_b64encode
+import subprocess
+import sys
 import unittest
 import pep8
 import json
 import os
+from datetime import datetime
+from unittest import mock
+import models
+import asyncio
+from api.v1 import asgi
+from api.v1.app import app
+from api.v1.views.cache import LocalBackend
 from models.base_model import BaseModel
 from models.user import User
 from models.state import State
@@ -32,5 +42,553 @@ class TestApi(unittest.TestCase):
         self.assertEqual(p.total_errors, 0, "fix pep8")
 
 
+class TestJSONProvider(unittest.TestCase):
+    ''' Test the JSON provider backed by the storage codec '''
+
+    def test_dumps(self):
+        ''' Test that responses are compact, sorted and use default '''
+        with app.app_context():
+            response = app.json.response({"b": datetime(2017, 9, 28),
+                                          "a": "Café"})
+        expected = {"a": "Café", "b": "Thu, 28 Sep 2017 00:00:00 GMT"}
+        # compact and sorted, non-ASCII characters escaped or not per codec
+        self.assertIn(response.get_data(as_text=True),
+                      [json.dumps(expected, separators=(',', ':'),
+                                  sort_keys=True, ensure_ascii=ascii) + '\n'
+                       for ascii in [True, False]])
+
+    def test_loads(self):
+        ''' Test that request bodies are decoded '''
+        self.assertEqual(app.json.loads(b'{"name": "Caf\\u00e9"}'),
+                         {"name": "Café"})
+
+
+class TestPool(unittest.TestCase):
+    ''' Test the connection pool metrics view '''
+
+    def test_no_pool(self):
+        ''' Test that a storage without a pool answers 404 '''
+        with mock.patch('api.v1.views.index.storage', object()):
+            response = app.test_client().get('/api/v1/pool')
+        self.assertEqual(response.status_code, 404)
+
+    def test_stats(self):
+        ''' Test that the metrics of the storage pool are returned '''
+        storage = mock.Mock()
+        storage.pool_stats.return_value = {"checked_out": 2, "overflow": 1}
+        with mock.patch('api.v1.views.index.storage', storage):
+            response = app.test_client().get('/api/v1/pool')
+        self.assertEqual(response.get_json(),
+                         {"checked_out": 2, "overflow": 1})
+
+
+class TestPagination(unittest.TestCase):
+    ''' Test the limit and cursor parameters of collection views '''
+
+    def setUp(self):
+        ''' Creates a state with five cities '''
+        self.client = app.test_client()
+        self.state = State(name="California")
+        self.cities = [City(name=str(i), state_id=self.state.id)
+                       for i in range(5)]
+        for i, city in enumerate(self.cities):
+            city.created_at = datetime(2017, 9, 28, i)
+        for obj in [self.state] + self.cities:
+            models.storage.new(obj)
+        # listings are streamed from a session of their own
+        models.storage.save()
+
+    def tearDown(self):
+        ''' Removes the state and its cities '''
+        for obj in [self.state] + self.cities:
+            models.storage.delete(obj)
+        models.storage.save()
+
+    def test_no_limit(self):
+        ''' Test that the whole list is returned without a limit '''
+        url = '/api/v1/states/{}/cities'.format(self.state.id)
+        response = self.client.get(url)
+        self.assertEqual(len(response.get_json()), 5)
+        self.assertNotIn('Link', response.headers)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_follow_next(self):
+        ''' Test that following the next links walks the whole list '''
+        url = '/api/v1/states/{}/cities?limit=2'.format(self.state.id)
+        ids = []
+        while url is not None:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            ids.extend(city['id'] for city in response.get_json())
+            link = response.headers.get('Link')
+            url = link[1:link.index('>')] if link else None
+        self.assertEqual(ids, [city.id for city in self.cities])
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_bad_parameters(self):
+        ''' Test that invalid limits and cursors are rejected '''
+        url = '/api/v1/states/{}/cities'.format(self.state.id)
+        self.assertEqual(self.client.get(url + '?limit=0').status_code, 400)
+        self.assertEqual(self.client.get(url + '?cursor=x').status_code, 400)
+        created_at = self.cities[0].created_at.strftime(
+            '%Y-%m-%dT%H:%M:%S.%f')
+        for keyset in [[created_at, 5], [created_at, None], [created_at],
+                       {created_at: 1, 'id': 2}]:
+            cursor = urlsafe_b64encode(json.dumps(keyset).encode()).decode()
+            response = self.client.get(url + '?limit=1&cursor=' + cursor)
+            self.assertEqual(response.status_code, 400)
+
+
+class TestStreaming(unittest.TestCase):
+    ''' Test the streamed JSON lists of collection views '''
+
+    def setUp(self):
+        ''' Creates a state and a test client '''
+        self.client = app.test_client()
+        self.state = State(name="California")
+        models.storage.new(self.state)
+
+    def tearDown(self):
+        ''' Removes the state and its cities '''
+        for city in self.state.cities:
+            models.storage.delete(city)
+        models.storage.delete(self.state)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_empty_list(self):
+        ''' Test that an empty collection streams an empty list '''
+        url = '/api/v1/states/{}/cities'.format(self.state.id)
+        response = self.client.get(url)
+        self.assertTrue(response.is_streamed)
+        self.assertEqual(response.get_json(), [])
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_many_chunks(self):
+        ''' Test that a list spanning several chunks is valid JSON '''
+        cities = [City(name=str(i), state_id=self.state.id)
+                  for i in range(250)]
+        for city in cities:
+            models.storage.new(city)
+        url = '/api/v1/states/{}/cities'.format(self.state.id)
+        response = self.client.get(url)
+        self.assertTrue(response.is_streamed)
+        self.assertEqual(response.mimetype, 'application/json')
+        self.assertEqual(json.loads(response.get_data()),
+                         [city.to_dict() for city in cities])
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_from_storage(self):
+        ''' Test that a listing is streamed from storage, not read whole
+        before its first byte '''
+        city = City(name="Fremont", state_id=self.state.id)
+        models.storage.new(city)
+        url = '/api/v1/states/{}/cities'.format(self.state.id)
+        with mock.patch.object(models.storage, 'all',
+                               wraps=models.storage.all) as all, \
+                mock.patch.object(models.storage, 'stream',
+                                  wraps=models.storage.stream) as stream:
+            response = self.client.get(url)
+            self.assertEqual(response.get_json(), [city.to_dict()])
+        self.assertEqual(all.call_count, 0)
+        stream.assert_called_once_with(City, state_id=self.state.id)
+
+
+class TestPlacesSearch(unittest.TestCase):
+    ''' Test the places_search view '''
+
+    def setUp(self):
+        ''' Creates two places in two cities of a state '''
+        self.client = app.test_client()
+        self.state = State(name="California")
+        self.city = City(name="Fremont", state_id=self.state.id)
+        self.wifi = Amenity(name="Wifi")
+        self.place = Place(name="House", city_id=self.city.id,
+                           amenity_ids=[self.wifi.id])
+        self.other = Place(name="Flat", city_id=self.city.id)
+        self.objs = [self.state, self.city, self.wifi, self.place, self.other]
+        for obj in self.objs:
+            models.storage.new(obj)
+
+    def tearDown(self):
+        ''' Removes the created objects '''
+        for obj in self.objs:
+            models.storage.delete(obj)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_search(self):
+        ''' Test that places are filtered by state and amenity '''
+        response = self.client.post('/api/v1/places_search', json={
+            'states': [self.state.id], 'amenities': [self.wifi.id]})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([place['id'] for place in response.get_json()],
+                         [self.place.id])
+        response = self.client.post('/api/v1/places_search', json={
+            'cities': [self.city.id]})
+        self.assertEqual(len(response.get_json()), 2)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_not_json(self):
+        ''' Test that a body which is not JSON is rejected '''
+        response = self.client.post('/api/v1/places_search', data='x')
+        self.assertEqual(response.status_code, 400)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_not_lists(self):
+        ''' Test that states, cities and amenities must be lists of ids '''
+        for data in [{'amenities': 5}, {'states': [[1]]}, {'states': 'abc'},
+                     {'cities': [None]}]:
+            response = self.client.post('/api/v1/places_search', json=data)
+            self.assertEqual(response.status_code, 400)
+        response = self.client.post('/api/v1/places_search',
+                                    json={'states': None, 'cities': []})
+        self.assertEqual(response.status_code, 200)
+
+
+class TestConditional(unittest.TestCase):
+    ''' Test the ETag and Last-Modified validators of the views '''
+
+    def setUp(self):
+        ''' Creates a state with a city '''
+        self.client = app.test_client()
+        self.state = State(name="California")
+        self.city = City(name="Fremont", state_id=self.state.id)
+        for obj in [self.state, self.city]:
+            models.storage.new(obj)
+
+    def tearDown(self):
+        ''' Removes the state and its city '''
+        for obj in [self.state, self.city]:
+            models.storage.delete(obj)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_if_none_match(self):
+        ''' Test that a matching ETag gets a 304 until the state changes '''
+        url = '/api/v1/states/{}'.format(self.state.id)
+        response = self.client.get(url)
+        etag = response.headers['ETag']
+        self.assertIn('Last-Modified', response.headers)
+        response = self.client.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.get_data(), b'')
+        self.client.put(url, json={'name': 'Nevada'})
+        response = self.client.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers['ETag'], etag)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_if_modified_since(self):
+        ''' Test that a resource unmodified since a date gets a 304 '''
+        url = '/api/v1/states/{}'.format(self.state.id)
+        since = self.client.get(url).headers['Last-Modified']
+        response = self.client.get(url, headers={'If-Modified-Since': since})
+        self.assertEqual(response.status_code, 304)
+        since = 'Sat, 01 Jan 2000 00:00:00 GMT'
+        response = self.client.get(url, headers={'If-Modified-Since': since})
+        self.assertEqual(response.status_code, 200)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_collection(self):
+        ''' Test that a collection ETag changes with its members '''
+        url = '/api/v1/states/{}/cities'.format(self.state.id)
+        etag = self.client.get(url).headers['ETag']
+        response = self.client.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        models.storage.delete(self.city)
+        response = self.client.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json(), [])
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_collection_versions(self):
+        ''' Test that a collection ETag is told from the version of its
+        class, its filter and its page, without reading the objects '''
+        url = '/api/v1/states/{}/cities'.format(self.state.id)
+        etag = self.client.get(url).headers['ETag']
+        with mock.patch.object(models.storage, 'all',
+                               wraps=models.storage.all) as all:
+            response = self.client.get(url,
+                                       headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(all.call_count, 0)
+        other = State(name="Nevada")
+        models.storage.new(other)
+        self.addCleanup(models.storage.delete, other)
+        etag = self.client.get(url).headers['ETag']
+        etags = {etag, self.client.get(url + '?limit=1').headers['ETag'],
+                 self.client.get('/api/v1/states/{}/cities'.format(other.id))
+                 .headers['ETag']}
+        self.assertEqual(len(etags), 3)
+        self.city.name = "Oakland"
+        self.assertNotEqual(self.client.get(url).headers['ETag'], etag)
+
+
+class TestCache(unittest.TestCase):
+    ''' Test the response cache of the read-mostly views '''
+
+    def setUp(self):
+        ''' Creates a test client '''
+        self.client = app.test_client()
+
+    def test_hit(self):
+        ''' Test that a repeated request does not count the objects '''
+        with mock.patch.object(models.storage, 'counts',
+                               wraps=models.storage.counts) as counts:
+            first = self.client.get('/api/v1/stats?hit')
+            second = self.client.get('/api/v1/stats?hit')
+        self.assertEqual(counts.call_count, 1)
+        self.assertEqual(first.get_json(), second.get_json())
+        self.assertEqual(first.headers['ETag'], second.headers['ETag'])
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_invalidated(self):
+        ''' Test that a change to a class drops the cached responses '''
+        states = self.client.get('/api/v1/stats').get_json()['states']
+        state = State(name="California")
+        models.storage.new(state)
+        stats = self.client.get('/api/v1/stats').get_json()
+        self.assertEqual(stats['states'], states + 1)
+        ids = [s['id'] for s in self.client.get('/api/v1/states').get_json()]
+        self.assertIn(state.id, ids)
+        models.storage.delete(state)
+        stats = self.client.get('/api/v1/stats').get_json()
+        self.assertEqual(stats['states'], states)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_other_process(self):
+        ''' Test that a state saved by another process drops the cache '''
+        ids = [s['id'] for s in self.client.get('/api/v1/states').get_json()]
+        worker = "\n".join([
+            "from models import storage",
+            "from models.state import State",
+            "state = State(name='Nevada')",
+            "storage.new(state)",
+            "storage.save()",
+            "print(state.id)"])
+        id = subprocess.run([sys.executable, "-c", worker], check=True,
+                            capture_output=True, text=True).stdout.strip()
+        try:
+            states = self.client.get('/api/v1/states').get_json()
+            self.assertEqual(sorted(s['id'] for s in states),
+                             sorted(ids + [id]))
+        finally:
+            models.storage.delete(models.storage.get(State, id))
+            models.storage.save()
+
+    def test_local_backend(self):
+        ''' Test that the local backend evicts old and expired entries '''
+        backend = LocalBackend(2)
+        backend.set('a', 1, 60)
+        backend.set('b', 2, 60)
+        backend.get('a')
+        backend.set('c', 3, 60)
+        self.assertEqual(backend.get('a'), 1)
+        self.assertIsNone(backend.get('b'))
+        backend.set('d', 4, 0)
+        self.assertIsNone(backend.get('d'))
+        backend.incr('v')
+        self.assertEqual(backend.counter('v'), 1)
+
+
+class TestBatch(unittest.TestCase):
+    ''' Test the batch views '''
+
+    def setUp(self):
+        ''' Creates a test client '''
+        self.client = app.test_client()
+
+    def test_create_update_delete(self):
+        ''' Test that a batch is applied with one save per request '''
+        with mock.patch.object(models.storage, 'save',
+                               wraps=models.storage.save) as save:
+            response = self.client.post('/api/v1/states/batch', json=[
+                {'name': 'California'}, {'id': 'x'}, {'name': 'Nevada'}])
+        self.assertEqual(save.call_count, 1)
+        results = response.get_json()
+        self.assertEqual([r['status'] for r in results], [201, 400, 201])
+        self.assertEqual(results[1]['error'], 'Missing name')
+        ids = [results[0]['object']['id'], results[2]['object']['id']]
+        self.assertEqual(models.storage.get(State, ids[1]).name, 'Nevada')
+        response = self.client.put('/api/v1/states/batch', json=[
+            {'id': ids[0], 'name': 'Arizona'}, {'id': 'missing'}])
+        self.assertEqual([r['status'] for r in response.get_json()],
+                         [200, 404])
+        self.assertEqual(models.storage.get(State, ids[0]).name, 'Arizona')
+        response = self.client.delete('/api/v1/states/batch', json=ids)
+        self.assertEqual([r['status'] for r in response.get_json()],
+                         [200, 200])
+        self.assertIsNone(models.storage.get(State, ids[0]))
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_parents(self):
+        ''' Test that created objects must reference existing parents '''
+        state = State(name="California")
+        models.storage.new(state)
+        response = self.client.post('/api/v1/cities/batch', json=[
+            {'name': 'Fremont', 'state_id': state.id},
+            {'name': 'Nowhere', 'state_id': 'missing'},
+            {'name': 'Nameless'}])
+        results = response.get_json()
+        self.assertEqual([r['status'] for r in results], [201, 404, 400])
+        self.assertEqual([city.name for city in state.cities], ['Fremont'])
+        models.storage.delete(state.cities[0])
+        models.storage.delete(state)
+
+    def test_invalid_items(self):
+        ''' Test that invalid dates and ids fail alone, before any change '''
+        with mock.patch.object(models.storage, 'new',
+                               wraps=models.storage.new) as new:
+            response = self.client.post('/api/v1/states/batch', json=[
+                {'name': 'good'}, {'name': 'bad', 'created_at': 'garbage'},
+                {'name': 'bad', 'id': 5}])
+        results = response.get_json()
+        self.assertEqual([r['status'] for r in results], [201, 400, 400])
+        self.assertEqual(results[1]['error'], 'Invalid created_at')
+        self.assertEqual(results[2]['error'], 'Invalid id')
+        self.assertEqual(new.call_count, 1)
+        id = results[0]['object']['id']
+        models.storage.delete(models.storage.get(State, id))
+        models.storage.save()
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_not_saved(self):
+        ''' Test that a batch failing to save is rolled back whole '''
+        state = State(name='California')
+        models.storage.new(state)
+        models.storage.save()
+        with mock.patch.object(models.storage, 'save',
+                               side_effect=OSError('disk full')):
+            response = self.client.post('/api/v1/states/batch', json=[
+                {'name': 'Nevada'}, {'id': 'x'}])
+            results = response.get_json()
+            self.assertEqual(results, [{'status': 409, 'error': 'Not saved'},
+                                       {'status': 400,
+                                        'error': 'Missing name'}])
+            response = self.client.put('/api/v1/states/batch', json=[
+                {'id': state.id, 'name': 'Arizona'}])
+            self.assertEqual(response.get_json()[0]['status'], 409)
+        self.assertEqual(models.storage.get(State, state.id).name,
+                         'California')
+        self.assertEqual([s.name for s in models.storage.all(State).values()
+                          if s.name == 'Nevada'], [])
+        models.storage.delete(models.storage.get(State, state.id))
+        models.storage.save()
+
+    def test_not_a_list(self):
+        ''' Test that a body which is not a JSON list is rejected '''
+        response = self.client.post('/api/v1/states/batch', json={})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get('/api/v1/states/batch')
+        self.assertEqual(response.status_code, 404)
+
+
+class TestASGI(unittest.TestCase):
+    ''' Test the ASGI entry point '''
+
+    def call(self, method, path, body=b'', headers=()):
+        ''' Returns the messages the ASGI app sends for a request '''
+        path, _, query = path.partition('?')
+        scope = {'type': 'http', 'method': method, 'path': path,
+                 'query_string': query.encode(), 'http_version': '1.1',
+                 'headers': [(name.encode(), value.encode())
+                             for name, value in headers]}
+        # the body arrives in two messages
+        received = [{'type': 'http.request', 'body': body[:1],
+                     'more_body': True},
+                    {'type': 'http.request', 'body': body[1:]}]
+        sent = []
+
+        async def receive():
+            ''' Returns the next request message '''
+            return received.pop(0)
+
+        async def send(message):
+            ''' Records the response message '''
+            sent.append(message)
+
+        asyncio.run(asgi.app(scope, receive, send))
+        return sent
+
+    def response(self, sent):
+        ''' Returns the status, headers and body of the sent messages '''
+        self.assertEqual(sent[0]['type'], 'http.response.start')
+        self.assertFalse(sent[-1]['more_body'])
+        self.assertTrue(all(message['more_body'] for message in sent[1:-1]))
+        return (sent[0]['status'], dict(sent[0]['headers']),
+                b''.join(message['body'] for message in sent[1:]))
+
+    def test_status(self):
+        ''' Test that a view answers through the ASGI app '''
+        status, headers, body = self.response(self.call('GET',
+                                                        '/api/v1/status'))
+        self.assertEqual(status, 200)
+        self.assertEqual(headers[b'content-type'], b'application/json')
+        self.assertEqual(json.loads(body), {'status': 'OK'})
+
+    def test_not_found(self):
+        ''' Test that the JSON 404 handler answers unknown paths '''
+        status, headers, body = self.response(self.call('GET', '/nowhere'))
+        self.assertEqual(status, 404)
+        self.assertEqual(json.loads(body), {'error': 'Not found'})
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_post(self):
+        ''' Test that request bodies and queries reach the views '''
+        state = State(name='California')
+        models.storage.new(state)
+        try:
+            body = json.dumps({'name': 'Fremont'}).encode()
+            status, headers, body = self.response(self.call(
+                'POST', '/api/v1/states/{}/cities'.format(state.id), body,
+                [('Content-Type', 'application/json')]))
+            self.assertEqual(status, 201)
+            self.assertEqual(json.loads(body)['name'], 'Fremont')
+            status, headers, body = self.response(self.call(
+                'GET', '/api/v1/states/{}/cities?limit=1'.format(state.id)))
+            self.assertEqual([city['name'] for city in json.loads(body)],
+                             ['Fremont'])
+        finally:
+            for city in state.cities:
+                models.storage.delete(city)
+            models.storage.delete(state)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_streamed(self):
+        ''' Test that streamed lists are sent chunk by chunk '''
+        state = State(name='California')
+        models.storage.new(state)
+        cities = [City(name=str(i), state_id=state.id) for i in range(250)]
+        for city in cities:
+            models.storage.new(city)
+        try:
+            url = '/api/v1/states/{}/cities'.format(state.id)
+            sent = self.call('GET', url)
+            self.assertGreater(len(sent), 2)
+            status, headers, body = self.response(sent)
+            self.assertEqual(status, 200)
+            self.assertEqual(body, app.test_client().get(url).get_data())
+        finally:
+            for city in cities:
+                models.storage.delete(city)
+            models.storage.delete(state)
+
+    def test_lifespan(self):
+        ''' Test that the app completes the lifespan messages '''
+        received = [{'type': 'lifespan.startup'},
+                    {'type': 'lifespan.shutdown'}]
+        sent = []
+
+        async def receive():
+            ''' Returns the next lifespan message '''
+            return received.pop(0)
+
+        async def send(message):
+            ''' Records the lifespan message '''
+            sent.append(message['type'])
+
+        asyncio.run(asgi.app({'type': 'lifespan'}, receive, send))
+        self.assertEqual(sent, ['lifespan.startup.complete',
+                                'lifespan.shutdown.complete'])
+
+
 if __name__ == "__main__":
     unittest.main()
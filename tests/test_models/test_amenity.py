@@ -76,6 +76,7 @@ class TestAmenity(unittest.TestCase):
         else:
             self.assertEqual(amenity.name, "")
 
+    @unittest.skipIf(models.base_model.slots, "instances have no __dict__")
     def test_to_dict_creates_dict(self):
         """test to_dict method creates a dictionary with proper attrs"""
         am = Amenity()
@@ -99,6 +100,7 @@ class TestAmenity(unittest.TestCase):
         self.assertEqual(new_d["created_at"], am.created_at.strftime(t_format))
         self.assertEqual(new_d["updated_at"], am.updated_at.strftime(t_format))
 
+    @unittest.skipIf(models.base_model.slots, "instances have no __dict__")
     def test_str(self):
         """test that the str method has the correct output"""
         amenity = Amenity()
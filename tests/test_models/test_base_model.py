@@ -7,6 +7,7 @@ import pep8 as pycodestyle
 import time
 import unittest
 from unittest import mock
+import weakref
 BaseModel = models.base_model.BaseModel
 module_doc = models.base_model.__doc__
 
@@ -58,6 +59,7 @@ class TestBaseModelDocs(unittest.TestCase):
 
 class TestBaseModel(unittest.TestCase):
     """Test the BaseModel class"""
+    @unittest.skipIf(models.base_model.slots, "instances have no __dict__")
     def test_instantiation(self):
         """Test that object is correctly created"""
         inst = BaseModel()
@@ -138,6 +140,83 @@ class TestBaseModel(unittest.TestCase):
         self.assertEqual(new_d["created_at"], bm.created_at.strftime(t_format))
         self.assertEqual(new_d["updated_at"], bm.updated_at.strftime(t_format))
 
+    def test_isoformat(self):
+        """test that isoformat matches strftime with the time format"""
+        t_format = "%Y-%m-%dT%H:%M:%S.%f"
+        for dt in [datetime(2017, 9, 28, 21, 5, 54, 119427),
+                   datetime(2017, 9, 28, 21, 5, 54), datetime(1, 1, 1)]:
+            with self.subTest(dt=dt):
+                self.assertEqual(models.base_model.isoformat(dt),
+                                 dt.strftime(t_format))
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing File Storage")
+    def test_to_dict_cache(self):
+        """test that a cached to_dict is dropped when an attribute is set"""
+        with mock.patch('models.base_model.dicts',
+                        weakref.WeakKeyDictionary()):
+            inst = BaseModel()
+            first = inst.to_dict()
+            first["name"] = "changed"
+            self.assertNotIn("name", inst.to_dict())
+            inst.name = "Holberton"
+            self.assertEqual(inst.to_dict()["name"], "Holberton")
+            self.assertEqual(inst.to_dict(), inst.to_dict())
+
+    def test_from_dict(self):
+        """test that from_dict rebuilds the instance to_dict described"""
+        inst = BaseModel()
+        inst.name = "Holberton"
+        d = inst.to_dict()
+        new = BaseModel.from_dict(d)
+        self.assertIsNot(new, inst)
+        self.assertIs(type(new), BaseModel)
+        self.assertEqual(new.to_dict(), d)
+        self.assertEqual(new.created_at, inst.created_at)
+        self.assertEqual(getattr(new, "name"), "Holberton")
+        self.assertIs(new.__class__, BaseModel)
+        new = BaseModel.from_dict({"name": "Holberton"})
+        self.assertIs(type(new.id), str)
+        self.assertIs(type(new.created_at), datetime)
+
+    def test_compact(self):
+        """test that Compact moves the class defaults to __slots__"""
+        class Slotted(metaclass=models.base_model.Compact):
+            """class with two defaults"""
+            __slots__ = ("id",)
+            name = ""
+            number = 0
+
+            def method(self):
+                """not a default"""
+
+        class Child(Slotted):
+            """class adding a default"""
+            text = "text"
+
+        self.assertEqual(Slotted.__slots__, ("id", "name", "number"))
+        self.assertEqual(Slotted.defaults, {"name": "", "number": 0})
+        self.assertEqual(Child.__slots__, ("text",))
+        self.assertEqual(Child.defaults,
+                         {"name": "", "number": 0, "text": "text"})
+        self.assertEqual([attr for attr, member in Child.members],
+                         ["id", "name", "number", "text"])
+        self.assertFalse(hasattr(Child(), "__dict__"))
+
+    @unittest.skipUnless(models.base_model.slots, "models use __dict__")
+    def test_slots(self):
+        """test that slotted instances behave like the __dict__ ones"""
+        inst = BaseModel()
+        self.assertFalse(hasattr(inst, "__dict__"))
+        inst.name = "Holberton"
+        self.assertEqual(inst.name, "Holberton")
+        self.assertEqual(inst.to_dict()["name"], "Holberton")
+        new = BaseModel.from_dict(inst.to_dict())
+        self.assertEqual(new.to_dict(), inst.to_dict())
+        self.assertIn("'name': 'Holberton'", str(new))
+        with self.assertRaises(AttributeError):
+            inst.missing
+
+    @unittest.skipIf(models.base_model.slots, "instances have no __dict__")
     def test_str(self):
         """test that the str method has the correct output"""
         inst = BaseModel()
@@ -8,6 +8,7 @@ import inspect
 import models
 from models import city
 from models.base_model import BaseModel
+from models.place import Place
 import pep8
 import unittest
 City = city.City
@@ -85,6 +86,7 @@ class TestCity(unittest.TestCase):
         else:
             self.assertEqual(city.state_id, "")
 
+    @unittest.skipIf(models.base_model.slots, "instances have no __dict__")
     def test_to_dict_creates_dict(self):
         """test to_dict method creates a dictionary with proper attrs"""
         c = City()
@@ -107,8 +109,21 @@ class TestCity(unittest.TestCase):
         self.assertEqual(new_d["created_at"], c.created_at.strftime(t_format))
         self.assertEqual(new_d["updated_at"], c.updated_at.strftime(t_format))
 
+    @unittest.skipIf(models.base_model.slots, "instances have no __dict__")
     def test_str(self):
         """test that the str method has the correct output"""
         city = City()
         string = "[City] ({}) {}".format(city.id, city.__dict__)
         self.assertEqual(string, str(city))
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing File Storage")
+    def test_places(self):
+        """test that places lists the places with the city's id"""
+        city = City()
+        place = Place(city_id=city.id)
+        other = Place(city_id="another city")
+        for obj in [city, place, other]:
+            models.storage.new(obj)
+        self.assertEqual(city.places, [place])
+        for obj in [city, place, other]:
+            models.storage.delete(obj)
@@ -0,0 +1,85 @@
+#!/usr/bin/python3
+"""
+Contains the TestCodec classes
+"""
+
+from datetime import datetime
+import inspect
+from models.engine import codec
+import pep8
+import unittest
+
+
+class TestCodecDocs(unittest.TestCase):
+    """Tests to check the documentation and style of the codec module"""
+
+    def test_pep8_conformance_codec(self):
+        """Test that models/engine/codec.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/codec.py',
+                                    'tests/test_models/test_engine/'
+                                    'test_codec.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_codec_module_docstring(self):
+        """Test for the codec.py module docstring"""
+        self.assertIsNot(codec.__doc__, None,
+                         "codec.py needs a docstring")
+        self.assertTrue(len(codec.__doc__) >= 1,
+                        "codec.py needs a docstring")
+
+    def test_codec_func_docstrings(self):
+        """Test for the presence of docstrings in codec functions"""
+        for func in inspect.getmembers(codec, inspect.isfunction):
+            with self.subTest(function=func):
+                self.assertIsNot(func[1].__doc__, None,
+                                 "{:s} needs a docstring".format(func[0]))
+
+
+class TestCodec(unittest.TestCase):
+    """Test the codecs"""
+
+    def codecs(self):
+        """returns every codec installed"""
+        found = {}
+        for name in codec.loaders:
+            try:
+                found[name] = codec.loaders[name]()
+            except ImportError:
+                pass
+        return found
+
+    def test_round_trip(self):
+        """Test that every codec reads back what it wrote"""
+        record = {"id": "1", "name": "Café", "number_rooms": 3,
+                  "latitude": 37.77, "amenity_ids": ["a", "b"],
+                  "description": None, "__class__": "Place"}
+        for name, (_, dumps, loads) in self.codecs().items():
+            with self.subTest(codec=name):
+                string = dumps(record)
+                self.assertIs(type(string), str)
+                self.assertEqual(loads(string), record)
+                self.assertEqual(loads(string.encode()), record)
+
+    def test_sort_keys_and_default(self):
+        """Test that every codec sorts keys and calls default"""
+        now = datetime(2017, 9, 28, 21, 5, 54)
+        for name, (_, dumps, loads) in self.codecs().items():
+            with self.subTest(codec=name):
+                string = dumps({"b": now, "a": 1}, sort_keys=True,
+                               default=lambda obj: "date")
+                self.assertEqual(string, '{"a":1,"b":"date"}')
+
+    def test_invalid(self):
+        """Test that every codec raises ValueError on invalid JSON"""
+        for name, (_, dumps, loads) in self.codecs().items():
+            with self.subTest(codec=name):
+                with self.assertRaises(ValueError):
+                    loads(b'{"key": ')
+
+    def test_load(self):
+        """Test that load prefers the codec asked for"""
+        self.assertEqual(codec.load("json")[0], "json")
+        self.assertIn(codec.load("unknown")[0], codec.loaders)
+        self.assertIn(codec.name, codec.loaders)
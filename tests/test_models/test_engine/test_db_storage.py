@@ -3,7 +3,9 @@
 Contains the TestDBStorageDocs and TestDBStorage classes
 """
 
+from contextlib import contextmanager
 from datetime import datetime
+import importlib
 import inspect
 import models
 from models.engine import db_storage
@@ -17,9 +19,18 @@ from models.user import User
 import json
 import os
 import pep8
+import sqlalchemy
+from sqlalchemy.orm import declarative_base, sessionmaker
+import tempfile
+import threading
 import unittest
+from unittest import mock
 
 DBStorage = db_storage.DBStorage
+Row = type("Row", (declarative_base(),),
+           {"__tablename__": "rows",
+            "id": sqlalchemy.Column(sqlalchemy.Integer, primary_key=True),
+            "name": sqlalchemy.Column(sqlalchemy.String(60))})
 classes = {
     "Amenity": Amenity,
     "City": City,
@@ -149,3 +160,348 @@ class TestFileStorage(unittest.TestCase):
         storage.delete(state2)
         new_count = storage.count()
         self.assertTrue(new_count == count)
+
+    @unittest.skipIf(models.storage_t != "db", "not testing db storage")
+    def test_counts(self):
+        """Test that counts matches count for each class"""
+        storage = models.storage
+        state = State(name="Baku")
+        state.save()
+        counts = storage.counts()
+        self.assertEqual(set(counts), set(classes))
+        for name, cls in classes.items():
+            self.assertEqual(counts[name], storage.count(cls))
+        storage.delete(state)
+        storage.save()
+
+    @unittest.skipIf(models.storage_t != "db", "not testing db storage")
+    def test_all_filters_limit_offset(self):
+        """Test that all filters and pages in the query"""
+        storage = models.storage
+        state = State(name="Baku")
+        state.save()
+        cities = [City(name=str(i), state_id=state.id) for i in range(3)]
+        for city in cities:
+            city.save()
+        found = storage.all(City, state_id=state.id)
+        self.assertEqual(len(found), 3)
+        self.assertEqual(len(storage.all(City, state_id=state.id,
+                                         limit=2)), 2)
+        self.assertEqual(len(storage.all(City, state_id=state.id,
+                                         offset=2)), 1)
+        for city in cities:
+            storage.delete(city)
+        storage.delete(state)
+        storage.save()
+
+    @unittest.skipIf(models.storage_t != "db", "not testing db storage")
+    def test_stream(self):
+        """Test that stream yields the objects matching filters"""
+        storage = models.storage
+        state = State(name="Baku")
+        state.save()
+        cities = [City(name=str(i), state_id=state.id) for i in range(3)]
+        for city in cities:
+            city.save()
+        found = storage.stream(City, batch=2, state_id=state.id)
+        self.assertEqual({city.id for city in found},
+                         {city.id for city in cities})
+        self.assertEqual(list(storage.stream("City", state_id="none")), [])
+        for city in cities:
+            storage.delete(city)
+        storage.delete(state)
+        storage.save()
+
+
+def sqlite_storage(case, **env):
+    """returns a DBStorage of a SQLite file configured by env, removed
+    after the test case"""
+    tmp = tempfile.TemporaryDirectory()
+    case.addCleanup(tmp.cleanup)
+    url = "sqlite:///" + os.path.join(tmp.name, "hbnb.db")
+
+    def engine(mysql_url, **kwargs):
+        """creates the engine of the SQLite file instead"""
+        return sqlalchemy.create_engine(url, **kwargs)
+
+    with mock.patch.dict(os.environ, env), \
+            mock.patch.object(db_storage, "create_engine", engine):
+        storage = DBStorage()
+    case.addCleanup(storage._DBStorage__engine.dispose)
+    return storage
+
+
+class TestPool(unittest.TestCase):
+    """Test the DBStorage connection pool against a SQLite stand-in"""
+
+    def storage(self, **env):
+        """returns a DBStorage of a SQLite file configured by env"""
+        return sqlite_storage(self, **env)
+
+    def test_options(self):
+        """Test that HBNB_MYSQL_POOL_* set the pool options"""
+        storage = self.storage(HBNB_MYSQL_POOL_SIZE="2",
+                               HBNB_MYSQL_MAX_OVERFLOW="1",
+                               HBNB_MYSQL_POOL_TIMEOUT="0.1",
+                               HBNB_MYSQL_POOL_RECYCLE="60",
+                               HBNB_MYSQL_POOL_PRE_PING="0")
+        pool = storage._DBStorage__engine.pool
+        self.assertIs(type(pool), db_storage.MeteredPool)
+        self.assertEqual(pool.size(), 2)
+        self.assertEqual(pool._max_overflow, 1)
+        self.assertEqual(pool._timeout, 0.1)
+        self.assertEqual(pool._recycle, 60)
+        self.assertFalse(pool._pre_ping)
+
+    def test_defaults(self):
+        """Test that connections are recycled and pinged by default"""
+        pool = self.storage()._DBStorage__engine.pool
+        self.assertEqual(pool.size(), 5)
+        self.assertEqual(pool._recycle, 3600)
+        self.assertTrue(pool._pre_ping)
+
+    def test_stats(self):
+        """Test that pool_stats counts connections, overflow and waits"""
+        storage = self.storage(HBNB_MYSQL_POOL_SIZE="1",
+                               HBNB_MYSQL_MAX_OVERFLOW="1",
+                               HBNB_MYSQL_POOL_TIMEOUT="0.05")
+        engine = storage._DBStorage__engine
+        first = engine.connect()
+        second = engine.connect()
+        stats = storage.pool_stats()
+        self.assertEqual(stats["checked_out"], 2)
+        self.assertEqual(stats["overflow"], 1)
+        with self.assertRaises(sqlalchemy.exc.TimeoutError):
+            engine.connect()
+        first.close()
+        second.close()
+        stats = storage.pool_stats()
+        self.assertEqual(stats["checked_out"], 0)
+        self.assertEqual(stats["checkouts"], 3)
+        self.assertEqual(stats["timeouts"], 1)
+        self.assertGreaterEqual(stats["max_wait"], 0.05)
+        self.assertGreaterEqual(stats["wait_time"], stats["max_wait"])
+
+
+class TestReplicas(unittest.TestCase):
+    """Test reads routed to replicas, SQLite files standing in for them"""
+
+    def setUp(self):
+        """creates a primary and two replicas each holding a named row"""
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.engines = {}
+        for name in ["primary", "r1", "r2"]:
+            engine = sqlalchemy.create_engine(
+                "sqlite:///" + os.path.join(tmp.name, name + ".db"))
+            self.addCleanup(engine.dispose)
+            Row.metadata.create_all(engine)
+            with engine.begin() as connection:
+                connection.execute(Row.__table__.insert(), {"name": name})
+            self.engines[name] = engine
+
+    def sessions(self, policy="round-robin"):
+        """returns a factory of sessions reading from the replicas"""
+        replicas = db_storage.Replicas([self.engines["r1"],
+                                        self.engines["r2"]], policy)
+        return sessionmaker(bind=self.engines["primary"],
+                            class_=db_storage.RoutingSession,
+                            replicas=replicas)
+
+    def test_round_robin(self):
+        """Test that each session reads from the next replica"""
+        Session = self.sessions()
+        first, second, third = Session(), Session(), Session()
+        self.assertEqual(first.query(Row).one().name, "r1")
+        self.assertEqual(second.query(Row).one().name, "r2")
+        self.assertEqual(first.query(Row).one().name, "r1")
+        self.assertEqual(third.query(Row).one().name, "r1")
+        for session in [first, second, third]:
+            session.close()
+
+    def test_least_loaded(self):
+        """Test that sessions read from the replica least checked out"""
+        Session = self.sessions("least-loaded")
+        busy = self.engines["r1"].connect()
+        for i in range(3):
+            session = Session()
+            self.assertEqual(session.query(Row).one().name, "r2")
+            session.close()
+        busy.close()
+
+    def test_read_after_write(self):
+        """Test that a session reads from the primary once it wrote"""
+        Session = self.sessions()
+        session = Session()
+        self.assertEqual(session.query(Row).count(), 1)
+        session.add(Row(name="new"))
+        self.assertEqual(session.query(Row).count(), 2)
+        session.commit()
+        self.assertEqual(session.query(Row).count(), 2)
+        self.assertEqual(session.get(Row, 1).name, "primary")
+        session.close()
+        session = Session()
+        self.assertEqual(session.query(Row).count(), 1)
+        session.close()
+
+    def test_no_replicas(self):
+        """Test that sessions without replicas use the primary"""
+        session = sessionmaker(bind=self.engines["primary"],
+                               class_=db_storage.RoutingSession)()
+        self.assertEqual(session.query(Row).one().name, "primary")
+        session.close()
+
+    def test_policy(self):
+        """Test that an unknown policy is refused"""
+        with self.assertRaises(ValueError):
+            db_storage.Replicas([self.engines["r1"]], "random")
+
+    def test_storage(self):
+        """Test that HBNB_MYSQL_REPLICAS adds an engine per host"""
+        urls = []
+
+        def engine(url, **kwargs):
+            """records url and creates an in memory engine"""
+            urls.append(url)
+            return sqlalchemy.create_engine("sqlite://", **kwargs)
+
+        with mock.patch.dict(os.environ, {"HBNB_MYSQL_HOST": "primary",
+                                          "HBNB_MYSQL_REPLICAS": "r1, r2"}), \
+                mock.patch.object(db_storage, "create_engine", engine):
+            storage = DBStorage()
+        self.assertEqual([url.split("@")[1].split("/")[0] for url in urls],
+                         ["primary", "r1", "r2"])
+        self.assertEqual(len(storage.pool_stats()["replicas"]), 2)
+
+
+class TestListeners(unittest.TestCase):
+    """Test that listeners hear of changes once committed"""
+
+    def setUp(self):
+        """subscribes to a DBStorage of a SQLite file"""
+        self.storage = sqlite_storage(self)
+        self.storage.reload()
+        self.addCleanup(self.storage.close)
+        self.names = []
+        self.storage.subscribe(self.names.append)
+        self.addCleanup(DBStorage._DBStorage__listeners.remove,
+                        self.names.append)
+
+    @unittest.skipIf(models.storage_t != "db", "not testing db storage")
+    def test_commit(self):
+        """Test that new and delete are told after save, not before"""
+        state = State(name="California")
+        self.storage.new(state)
+        self.assertEqual(self.names, [])
+        self.storage.save()
+        self.assertEqual(self.names, ["State"])
+        self.storage.delete(state)
+        self.storage.rollback()
+        self.storage.save()
+        self.assertEqual(self.names, ["State"])
+        self.storage.delete(state)
+        self.storage.save()
+        self.assertEqual(self.names, ["State", "State"])
+
+    @unittest.skipIf(models.storage_t != "db", "not testing db storage")
+    def test_read_before_save(self):
+        """Test that a read between new and save is not cached as new"""
+        cache = {}
+
+        def read():
+            """caches the states counted under the version of State"""
+            cache[len(self.names)] = self.storage.count(State)
+            self.storage.close()
+
+        self.storage.new(State(name="California"))
+        reader = threading.Thread(target=read)
+        reader.start()
+        reader.join()
+        self.storage.save()
+        self.assertEqual(cache, {0: 0})
+        self.assertNotIn(len(self.names), cache)
+
+
+class TestEagerLoading(unittest.TestCase):
+    """Test that loading relationships takes a constant number of queries"""
+
+    @contextmanager
+    def statements(self):
+        """yields the list of SQL statements run inside the block"""
+        found = []
+        engine = models.storage._DBStorage__engine
+
+        def record(conn, cursor, statement, *args):
+            """records statement"""
+            found.append(statement)
+
+        sqlalchemy.event.listen(engine, "before_cursor_execute", record)
+        try:
+            yield found
+        finally:
+            sqlalchemy.event.remove(engine, "before_cursor_execute", record)
+
+    def create(self, count):
+        """returns count new states having two cities each"""
+        states = []
+        for i in range(count):
+            state = State(name="State {}".format(i))
+            state.save()
+            for j in range(2):
+                City(name="City {}".format(j), state_id=state.id).save()
+            states.append(state)
+        models.storage.close()
+        self.addCleanup(self.remove, states)
+        return states
+
+    def remove(self, states):
+        """deletes states and their cities"""
+        storage = models.storage
+        for state in states:
+            for city in storage.all(City, state_id=state.id).values():
+                storage.delete(city)
+            storage.delete(storage.get(State, state.id))
+        storage.save()
+        storage.close()
+
+    def cities_of(self, count):
+        """returns the statements loading count states and their cities"""
+        self.create(count)
+        with self.statements() as found:
+            for state in models.storage.all(State, load=("cities",)).values():
+                self.assertTrue(all(city.state_id == state.id
+                                    for city in state.cities))
+        models.storage.close()
+        return len(found)
+
+    @unittest.skipIf(models.storage_t != "db", "not testing db storage")
+    def test_all(self):
+        """Test that all loads the cities of any number of states at once"""
+        self.assertEqual(self.cities_of(2), self.cities_of(6))
+
+    @unittest.skipIf(models.storage_t != "db", "not testing db storage")
+    def test_nested(self):
+        """Test that dotted paths load the relationships of relationships"""
+        state = self.create(1)[0]
+        got = models.storage.get(State, state.id, load=("cities.places",
+                                                        "unknown"))
+        with self.statements() as found:
+            places = [city.places for city in got.cities]
+        self.assertEqual(places, [[], []])
+        self.assertEqual(found, [])
+        models.storage.close()
+
+    @unittest.skipIf(models.storage_t != "db", "not testing db storage")
+    def test_pages(self):
+        """Test that the cities pages take as many queries whatever the
+        number of states"""
+        client = importlib.import_module(
+            "web_flask.8-cities_by_states").app.test_client()
+        counts = []
+        for count in [2, 6]:
+            self.create(count)
+            with self.statements() as found:
+                self.assertEqual(client.get("/cities_by_states").status_code,
+                                 200)
+            counts.append(len(found))
+        self.assertEqual(counts[0], counts[1])
@@ -6,7 +6,7 @@ Contains the TestFileStorageDocs classes
 from datetime import datetime
 import inspect
 import models
-from models.engine import file_storage
+from models.engine import file_storage, snapshot
 from models.amenity import Amenity
 from models.base_model import BaseModel
 from models.city import City
@@ -17,6 +17,9 @@ from models.user import User
 import json
 import os
 import pep8
+import subprocess
+import sys
+import threading
 import unittest
 
 FileStorage = file_storage.FileStorage
@@ -98,6 +101,28 @@ test_file_storage.py"
 class TestFileStorage(unittest.TestCase):
     """Test the FileStorage class"""
 
+    def isolated(self, path=None):
+        """returns a FileStorage on no objects, saving to path if given,
+        and puts back the objects and removes its files after the test"""
+        save = FileStorage._FileStorage__objects
+        dirty = FileStorage._FileStorage__dirty
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__dirty = {}
+
+        def restore():
+            """puts back the objects and removes the files of path"""
+            FileStorage._FileStorage__objects = save
+            FileStorage._FileStorage__dirty = dirty
+            for name in [path, path + ".lock", path + ".journal"] \
+                    if path else []:
+                if os.path.exists(name):
+                    os.remove(name)
+        self.addCleanup(restore)
+        storage = FileStorage()
+        if path:
+            storage._FileStorage__file_path = path
+        return storage
+
     @unittest.skipIf(models.storage_t == "db", "not testing file storage")
     def test_all_returns_dict(self):
         """Test that all returns the FileStorage.__objects attr"""
@@ -134,6 +159,8 @@ class TestFileStorage(unittest.TestCase):
         save = FileStorage._FileStorage__objects
         FileStorage._FileStorage__objects = new_dict
         storage.save()
+        # with the records other processes saved, merged by save
+        new_dict = dict(storage.all())
         FileStorage._FileStorage__objects = save
         for key, value in new_dict.items():
             new_dict[key] = value.to_dict()
@@ -175,3 +202,409 @@ class TestFileStorage(unittest.TestCase):
         FileStorage._FileStorage__objects = save
         count = storage.count()
         self.assertEqual(count, 7)
+
+    @unittest.skipIf(models.storage_t == "db", "not testing file storage")
+    def test_close_keeps_unchanged_objects(self):
+        """Test that close keeps objects when the file is unchanged"""
+        storage = self.isolated("test_close.json")
+        state = State(name="California")
+        storage.new(state)
+        storage.save()
+        storage.close()
+        key = "State." + state.id
+        self.assertIs(storage.all()[key], state)
+
+    @unittest.skipIf(models.storage_t == "db", "not testing file storage")
+    def test_close_rebuilds_changed_objects(self):
+        """Test that close picks up records changed on disk"""
+        storage = self.isolated("test_close.json")
+        state = State(name="California")
+        city = City(name="Fremont", state_id=state.id)
+        storage.new(state)
+        storage.new(city)
+        storage.save()
+        with open("test_close.json", "r") as f:
+            jo = json.load(f)
+        jo["State." + state.id]["name"] = "Nevada"
+        del jo["City." + city.id]
+        with open("test_close.json", "w") as f:
+            json.dump(jo, f)
+            f.write(" ")
+        storage.close()
+        objs = storage.all()
+        self.assertEqual(objs["State." + state.id].name, "Nevada")
+        self.assertIsNot(objs["State." + state.id], state)
+        self.assertNotIn("City." + city.id, objs)
+
+    @unittest.skipIf(models.storage_t == "db", "not testing file storage")
+    def test_save_journal(self):
+        """Test that journal mode appends changes and reload replays them"""
+        storage = self.isolated("test_journal.json")
+        storage._FileStorage__journal = True
+        state = State(name="California")
+        city = City(name="Fremont", state_id=state.id)
+        storage.new(state)
+        storage.new(city)
+        storage.save()
+        self.assertFalse(os.path.exists("test_journal.json"))
+        state.name = "Nevada"
+        storage.delete(city)
+        storage.save()
+        with open("test_journal.json.journal", "r") as f:
+            self.assertEqual(len(f.readlines()), 4)
+        FileStorage._FileStorage__objects = {}
+        storage.reload()
+        objs = storage.all()
+        self.assertEqual(list(objs), ["State." + state.id])
+        self.assertEqual(objs["State." + state.id].name, "Nevada")
+
+    @unittest.skipIf(models.storage_t == "db", "not testing file storage")
+    def test_save_journal_compacts(self):
+        """Test that the journal is folded into the JSON file at threshold"""
+        storage = self.isolated("test_journal.json")
+        storage._FileStorage__journal = True
+        storage._FileStorage__compact_at = 2
+        state = State(name="California")
+        storage.new(state)
+        storage.save()
+        self.assertTrue(os.path.exists("test_journal.json.journal"))
+        state.name = "Nevada"
+        storage.save()
+        self.assertFalse(os.path.exists("test_journal.json.journal"))
+        with open("test_journal.json", "r") as f:
+            jo = json.load(f)
+        self.assertEqual(jo["State." + state.id]["name"], "Nevada")
+
+    @unittest.skipIf(models.storage_t == "db", "not testing file storage")
+    def test_save_msgpack(self):
+        """Test that the msgpack format is saved and reloaded"""
+        storage = self.isolated("test_snapshot.json")
+        storage._FileStorage__format = "msgpack"
+        place = Place(name="Loft", amenity_ids=["a", "b"])
+        storage.new(place)
+        storage.new(State(name="California"))
+        storage.save()
+        with open("test_snapshot.json", "rb") as f:
+            self.assertTrue(f.read().startswith(snapshot.magic))
+        FileStorage._FileStorage__objects = {}
+        storage.reload()
+        self.assertEqual(storage.count(), 2)
+        new = storage.all()["Place." + place.id]
+        self.assertEqual(new.to_dict(), place.to_dict())
+
+    @unittest.skipIf(models.storage_t == "db", "not testing file storage")
+    def test_reload_lazy(self):
+        """Test that lazy mode builds objects only when they are used"""
+        storage = self.isolated("test_lazy.json")
+        state = State(name="California")
+        cities = [City(name=str(i), state_id="other") for i in range(3)]
+        city = City(name="Fremont", state_id=state.id)
+        for obj in [state, city] + cities:
+            storage.new(obj)
+        storage.save()
+        FileStorage._FileStorage__objects = {}
+        storage._FileStorage__lazy = True
+        storage.reload()
+        objs = FileStorage._FileStorage__objects
+        self.assertEqual(len(objs), 0)
+        self.assertEqual(storage.count(), 5)
+        self.assertEqual(storage.count(City), 4)
+        self.assertEqual(storage.counts()["City"], 4)
+        new = storage.get(State, state.id)
+        self.assertEqual(new.to_dict(), state.to_dict())
+        self.assertIs(storage.get(State, state.id), new)
+        self.assertEqual(list(storage.all(City, state_id=state.id)),
+                         ["City." + city.id])
+        self.assertEqual(len(objs), 2)
+        storage.save()
+        FileStorage._FileStorage__objects = {}
+        storage.reload()
+        self.assertEqual(len(storage.all()), 5)
+
+    @unittest.skipIf(models.storage_t == "db", "not testing file storage")
+    def test_reload_indexed(self):
+        """Test that an indexed snapshot is decoded a record at a time"""
+        storage = self.isolated("test_indexed.json")
+        storage._FileStorage__format = "indexed"
+        storage._FileStorage__lazy = True
+        state = State(name="California")
+        city = City(name="Fremont", state_id=state.id)
+        storage.new(state)
+        storage.new(city)
+        storage.new(City(name="Reno", state_id="other"))
+        storage.save()
+        FileStorage._FileStorage__objects = {}
+        storage.reload()
+        raw = FileStorage._FileStorage__raw
+        self.assertIs(type(raw["City"]["City." + city.id]),
+                      snapshot.Span)
+        self.assertEqual(storage.count(City), 2)
+        self.assertEqual(storage.get(State, state.id).name, "California")
+        self.assertEqual(list(storage.all(City, state_id=state.id)),
+                         ["City." + city.id])
+        self.assertEqual(len(storage.all()), 3)
+        storage.get(City, city.id).name = "Oakland"
+        storage.save()
+        FileStorage._FileStorage__objects = {}
+        storage.reload()
+        self.assertEqual(storage.get(City, city.id).name, "Oakland")
+
+    @unittest.skipIf(models.storage_t == "db", "not testing file storage")
+    def test_reload_converted_indexed(self):
+        """Test that a snapshot converted to indexed keeps its foreign keys"""
+        storage = self.isolated("test_convert.json")
+        # convert reads the snapshot alone, without a journal
+        storage._FileStorage__journal = False
+        state = State(name="California")
+        city = City(name="Fremont", state_id=state.id)
+        storage.new(state)
+        storage.new(city)
+        storage.new(City(name="Reno", state_id="other"))
+        storage.save()
+        snapshot.convert("test_convert.json", "test_indexed.json", "indexed")
+        storage = self.isolated("test_indexed.json")
+        storage._FileStorage__format = "indexed"
+        storage._FileStorage__lazy = True
+        storage.reload()
+        self.assertEqual(list(storage.all(City, state_id=state.id)),
+                         ["City." + city.id])
+
+    @unittest.skipIf(models.storage_t == "db", "not testing file storage")
+    def test_threads(self):
+        """Test that threads reading and writing see consistent objects"""
+        storage = self.isolated("test_threads.json")
+        state = State(name="California")
+        storage.new(state)
+        errors = []
+
+        def write():
+            """adds, saves and deletes cities"""
+            try:
+                for i in range(50):
+                    city = City(name=str(i), state_id=state.id)
+                    storage.new(city)
+                    storage.save()
+                    storage.delete(city)
+            except Exception as e:
+                errors.append(e)
+
+        def read():
+            """lists and counts the cities"""
+            try:
+                for i in range(200):
+                    storage.all(City, state_id=state.id)
+                    storage.all(City, limit=5)
+                    storage.counts()
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=write) for i in range(3)] + \
+            [threading.Thread(target=read) for i in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(storage.count(City), 0)
+
+    @unittest.skipIf(models.storage_t == "db", "not testing file storage")
+    def test_processes(self):
+        """Test that processes saving the same file keep each other's
+        objects and that reads pick them up"""
+        worker = "\n".join([
+            "import sys",
+            "from models.engine.file_storage import FileStorage",
+            "from models.state import State",
+            "FileStorage._FileStorage__objects = {}",
+            "storage = FileStorage()",
+            "storage._FileStorage__file_path = sys.argv[1]",
+            "storage.reload()",
+            "for i in range(20):",
+            "    storage.new(State(name=str(i)))",
+            "    storage.save()"])
+        storage = self.isolated("test_processes.json")
+        storage.reload()
+        workers = [subprocess.Popen([sys.executable, "-c", worker,
+                                     "test_processes.json"])
+                   for i in range(4)]
+        for process in workers:
+            self.assertEqual(process.wait(), 0)
+        self.assertEqual(storage.count(State), 80)
+        storage.new(State(name="here"))
+        storage.save()
+        FileStorage._FileStorage__objects = {}
+        storage.reload()
+        self.assertEqual(storage.count(State), 81)
+
+    @unittest.skipIf(models.storage_t == "db", "not testing file storage")
+    def test_load(self):
+        """Test that all and get take and ignore relationships to load"""
+        storage = self.isolated()
+        state = State(name="California")
+        storage.new(state)
+        self.assertEqual(storage.all(State, load=("cities",)),
+                         storage.all(State))
+        self.assertIs(storage.get(State, state.id, load=("cities",)), state)
+
+    @unittest.skipIf(models.storage_t == "db", "not testing file storage")
+    def test_index_skips_unhashable(self):
+        """Test that foreign keys set to anything but ids are not indexed"""
+        storage = self.isolated()
+        state = State(name="California")
+        place = Place(name="House", amenity_ids=["a", ["b"], {"c": 1}])
+        storage.new(state)
+        storage.new(place)
+        state.city_id = {"x": 1}
+        place.city_id = ["y"]
+        self.assertEqual(storage.all(State, name="California"),
+                         {"State." + state.id: state})
+        self.assertEqual(storage.all(Place, amenity_ids="a"),
+                         {"Place." + place.id: place})
+
+    @unittest.skipIf(models.storage_t == "db", "not testing file storage")
+    def test_all_filters_by_foreign_key(self):
+        """Test that all returns the objects of a class matching filters"""
+        storage = self.isolated()
+        state = State(name="California")
+        other = State(name="Nevada")
+        city = City(name="Fremont", state_id=state.id)
+        storage.new(state)
+        storage.new(other)
+        storage.new(city)
+        self.assertEqual(storage.all(City, state_id=state.id),
+                         {"City." + city.id: city})
+        self.assertEqual(storage.all("State", name="Nevada"),
+                         {"State." + other.id: other})
+        city.state_id = other.id
+        self.assertEqual(storage.all(City, state_id=state.id), {})
+        self.assertEqual(storage.all(City, state_id=other.id),
+                         {"City." + city.id: city})
+        storage.delete(city)
+        self.assertEqual(storage.all(City, state_id=other.id), {})
+
+    @unittest.skipIf(models.storage_t == "db", "not testing file storage")
+    def test_stream(self):
+        """Test that stream builds the objects it yields a batch at a time"""
+        storage = self.isolated("test_stream.json")
+        state = State(name="California")
+        cities = [City(name=str(i), state_id=state.id) for i in range(3)]
+        for obj in [state, City(name="Reno", state_id="other")] + cities:
+            storage.new(obj)
+        self.assertEqual(list(storage.stream(City, state_id=state.id)),
+                         cities)
+        storage.save()
+        FileStorage._FileStorage__objects = {}
+        storage._FileStorage__lazy = True
+        storage.reload()
+        found = storage.stream(City, batch=2, state_id=state.id)
+        self.assertEqual(next(found).id, cities[0].id)
+        self.assertEqual(len(FileStorage._FileStorage__objects), 2)
+        self.assertEqual([city.id for city in found],
+                         [city.id for city in cities[1:]])
+        self.assertEqual(len(FileStorage._FileStorage__objects), 3)
+        self.assertEqual(list(storage.stream("State", name="Nevada")), [])
+
+    @unittest.skipIf(models.storage_t == "db", "not testing file storage")
+    def test_update_keeps_order(self):
+        """Test that updating an object keeps its place in the listings"""
+        storage = self.isolated()
+        state = State(name="California")
+        cities = [City(name=str(i), state_id=state.id) for i in range(3)]
+        for obj in [state] + cities:
+            storage.new(obj)
+        cities[0].name = "Fremont"
+        storage.new(City(**cities[1].to_dict()))
+        self.assertEqual([city.id for city in storage.all(City).values()],
+                         [city.id for city in cities])
+        self.assertEqual(list(storage.all(City, state_id=state.id)),
+                         ["City." + city.id for city in cities])
+        cities[0].state_id = "other"
+        self.assertEqual(list(storage.all(City, state_id=state.id)),
+                         ["City." + city.id for city in cities[1:]])
+
+    @unittest.skipIf(models.storage_t == "db", "not testing file storage")
+    def test_count_cls(self):
+        """Test that count follows new and delete for a class"""
+        storage = self.isolated()
+        states = [State(), State()]
+        for state in states:
+            storage.new(state)
+        storage.new(City())
+        self.assertEqual(storage.count(State), 2)
+        self.assertEqual(storage.count("City"), 1)
+        storage.delete(states[0])
+        self.assertEqual(storage.count(State), 1)
+        self.assertEqual(storage.count(Amenity), 0)
+
+    @unittest.skipIf(models.storage_t == "db", "not testing file storage")
+    def test_all_limit_offset(self):
+        """Test that all returns a page of the matching objects"""
+        storage = self.isolated()
+        states = [State(name=str(i)) for i in range(5)]
+        for i, state in enumerate(reversed(states)):
+            state.created_at = datetime(2017, 9, 28 - i)
+            storage.new(state)
+        storage.new(City())
+        page = storage.all(State, limit=2, offset=1)
+        self.assertEqual(list(page.values()), states[1:3])
+        page = storage.all(State, offset=4)
+        self.assertEqual(list(page.values()), states[4:])
+        self.assertEqual(len(storage.all(limit=4)), 4)
+
+    @unittest.skipIf(models.storage_t == "db", "not testing file storage")
+    def test_counts(self):
+        """Test that counts returns the number of objects of each class"""
+        storage = self.isolated()
+        storage.new(State())
+        storage.new(State())
+        storage.new(User())
+        counts = storage.counts()
+        self.assertEqual(counts["State"], 2)
+        self.assertEqual(counts["User"], 1)
+        self.assertEqual(counts["Place"], 0)
+        self.assertEqual(set(counts), set(classes))
+
+    @unittest.skipIf(models.storage_t == "db", "not testing file storage")
+    def test_all_after(self):
+        """Test that all returns the objects sorted after a keyset"""
+        storage = self.isolated()
+        states = [State(name=str(i)) for i in range(4)]
+        for i, state in enumerate(states):
+            state.created_at = datetime(2017, 9, 28 - i // 2)
+            storage.new(state)
+        ordered = sorted(states, key=lambda s: (s.created_at, s.id))
+        after = (ordered[1].created_at, ordered[1].id)
+        page = storage.all(State, after=after)
+        self.assertEqual(list(page.values()), ordered[2:])
+        storage.delete(ordered[2])
+        page = storage.all(State, limit=1, after=after)
+        self.assertEqual(list(page.values()), ordered[3:])
+        ordered[0].created_at = datetime(2017, 9, 29)
+        page = storage.all(State, after=after)
+        self.assertEqual(list(page.values()), [ordered[3], ordered[0]])
+
+    @unittest.skipIf(models.storage_t == "db", "not testing file storage")
+    def test_places_search(self):
+        """Test that places_search combines states, cities and amenities"""
+        storage = self.isolated()
+        state = State()
+        city = City(state_id=state.id)
+        other_city = City(state_id="another state")
+        wifi = Amenity()
+        pool = Amenity()
+        place = Place(city_id=city.id, amenity_ids=[wifi.id, pool.id])
+        other = Place(city_id=other_city.id, amenity_ids=[wifi.id])
+        for obj in [state, city, other_city, wifi, pool, place, other]:
+            storage.new(obj)
+
+        def search(**kwargs):
+            return set(storage.places_search(**kwargs).values())
+        self.assertEqual(search(), {place, other})
+        self.assertEqual(search(states=[state.id]), {place})
+        self.assertEqual(search(states=[state.id],
+                                cities=[other_city.id]), {place, other})
+        self.assertEqual(search(amenities=[wifi.id]), {place, other})
+        self.assertEqual(search(amenities=[wifi.id, pool.id]), {place})
+        self.assertEqual(search(cities=[other_city.id],
+                                amenities=[pool.id]), set())
+        self.assertEqual(search(states=["no state"]), set())
@@ -0,0 +1,168 @@
+#!/usr/bin/python3
+"""
+Contains the TestRWLock and TestFileLock classes
+"""
+
+import fcntl
+import inspect
+from models.engine import locks
+import os
+import pep8
+import threading
+import unittest
+FileLock = locks.FileLock
+RWLock = locks.RWLock
+
+
+class TestRWLockDocs(unittest.TestCase):
+    """Tests to check the documentation and style of RWLock class"""
+
+    def test_pep8_conformance_locks(self):
+        """Test that models/engine/locks.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/locks.py',
+                                    'tests/test_models/test_engine/'
+                                    'test_locks.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_locks_module_docstring(self):
+        """Test for the locks.py module docstring"""
+        self.assertIsNot(locks.__doc__, None,
+                         "locks.py needs a docstring")
+        self.assertTrue(len(locks.__doc__) >= 1,
+                        "locks.py needs a docstring")
+
+    def test_rwlock_func_docstrings(self):
+        """Test for the presence of docstrings in RWLock methods"""
+        for func in inspect.getmembers(RWLock, inspect.isfunction):
+            with self.subTest(function=func):
+                self.assertIsNot(func[1].__doc__, None,
+                                 "{:s} needs a docstring".format(func[0]))
+
+    def test_filelock_func_docstrings(self):
+        """Test for the presence of docstrings in FileLock methods"""
+        for func in inspect.getmembers(FileLock, inspect.isfunction):
+            with self.subTest(function=func):
+                self.assertIsNot(func[1].__doc__, None,
+                                 "{:s} needs a docstring".format(func[0]))
+
+
+class TestRWLock(unittest.TestCase):
+    """Test the RWLock class"""
+
+    def test_readers_share(self):
+        """Test that readers hold the lock together"""
+        lock = RWLock()
+        both = threading.Barrier(2, timeout=5)
+
+        def read():
+            """holds the lock until the other reader does too"""
+            with lock.read():
+                both.wait()
+
+        thread = threading.Thread(target=read)
+        thread.start()
+        read()
+        thread.join()
+
+    def test_writer_excludes(self):
+        """Test that a writer waits for the reader and the reader after"""
+        lock = RWLock()
+        events = []
+        reading = threading.Event()
+
+        def write():
+            """writes once the reader started"""
+            reading.wait()
+            with lock.write():
+                events.append("write")
+
+        thread = threading.Thread(target=write)
+        thread.start()
+        with lock.read():
+            reading.set()
+            thread.join(0.1)
+            events.append("read")
+        thread.join()
+        self.assertEqual(events, ["read", "write"])
+
+    def test_reentrant(self):
+        """Test that the writer may write and read again, a reader read"""
+        lock = RWLock()
+        with lock.write():
+            with lock.write():
+                with lock.read():
+                    pass
+        with lock.read():
+            with lock.read():
+                pass
+        with lock.write():
+            pass
+
+    def test_no_upgrade(self):
+        """Test that a reader cannot become a writer"""
+        lock = RWLock()
+        with lock.read():
+            with self.assertRaises(RuntimeError):
+                with lock.write():
+                    pass
+        with lock.write():
+            pass
+
+
+class TestFileLock(unittest.TestCase):
+    """Test the FileLock class"""
+
+    path = "test_locks.lock"
+
+    def tearDown(self):
+        """removes the lock file"""
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def locked(self, mode):
+        """tells if another open file description cannot flock in mode"""
+        fd = os.open(self.path, os.O_RDWR)
+        try:
+            fcntl.flock(fd, mode | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return True
+        finally:
+            os.close(fd)
+        return False
+
+    def test_read_and_write(self):
+        """Test that readers exclude writers and writers everyone"""
+        lock = FileLock(self.path)
+        with lock.read():
+            self.assertFalse(self.locked(fcntl.LOCK_SH))
+            self.assertTrue(self.locked(fcntl.LOCK_EX))
+        with lock.write():
+            self.assertTrue(self.locked(fcntl.LOCK_SH))
+            with lock.read():
+                pass
+            self.assertTrue(self.locked(fcntl.LOCK_SH))
+        self.assertFalse(self.locked(fcntl.LOCK_EX))
+
+    def test_generation(self):
+        """Test that writers count generations seen by other locks"""
+        lock = FileLock(self.path)
+        other = FileLock(self.path)
+        self.assertEqual(lock.generation(), 0)
+        with lock.write():
+            self.assertEqual(lock.bump(), 1)
+        self.assertEqual(other.generation(), 1)
+        with other.write():
+            other.bump()
+        self.assertEqual(lock.generation(), 2)
+
+    def test_no_upgrade(self):
+        """Test that a reader can neither write nor count a write"""
+        lock = FileLock(self.path)
+        with lock.read():
+            with self.assertRaises(RuntimeError):
+                with lock.write():
+                    pass
+            with self.assertRaises(RuntimeError):
+                lock.bump()
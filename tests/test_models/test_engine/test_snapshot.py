@@ -0,0 +1,113 @@
+#!/usr/bin/python3
+"""
+Contains the TestSnapshot classes
+"""
+
+import inspect
+from models.engine import snapshot
+import os
+import pep8
+import unittest
+
+
+class TestSnapshotDocs(unittest.TestCase):
+    """Tests to check the documentation and style of the snapshot module"""
+
+    def test_pep8_conformance_snapshot(self):
+        """Test that models/engine/snapshot.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/snapshot.py',
+                                    'tests/test_models/test_engine/'
+                                    'test_snapshot.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_snapshot_module_docstring(self):
+        """Test for the snapshot.py module docstring"""
+        self.assertIsNot(snapshot.__doc__, None,
+                         "snapshot.py needs a docstring")
+        self.assertTrue(len(snapshot.__doc__) >= 1,
+                        "snapshot.py needs a docstring")
+
+    def test_snapshot_func_docstrings(self):
+        """Test for the presence of docstrings in snapshot functions"""
+        for func in inspect.getmembers(snapshot, inspect.isfunction):
+            with self.subTest(function=func):
+                self.assertIsNot(func[1].__doc__, None,
+                                 "{:s} needs a docstring".format(func[0]))
+
+
+class TestSnapshot(unittest.TestCase):
+    """Test the snapshot formats"""
+
+    records = {
+        "State.1": {"id": "1", "name": "California", "__class__": "State"},
+        "State.2": {"id": "2", "__class__": "State"},
+        "Place.3": {"id": "3", "name": "Loft", "amenity_ids": ["a"],
+                    "latitude": 37.77, "description": None,
+                    "__class__": "Place"},
+    }
+
+    def test_round_trip(self):
+        """Test that every format reads back the records it wrote"""
+        for format in snapshot.formats:
+            with self.subTest(format=format):
+                data = snapshot.encode(self.records, format)
+                self.assertIs(type(data), bytes)
+                self.assertEqual(snapshot.decode(data), self.records)
+
+    def test_msgpack_is_smaller(self):
+        """Test that msgpack stores the attribute names once per class"""
+        records = {"State." + str(i): {"id": str(i), "name": "California",
+                                       "__class__": "State"}
+                   for i in range(100)}
+        data = snapshot.encode(records, "msgpack")
+        self.assertTrue(data.startswith(snapshot.magic))
+        self.assertEqual(data.count(b"name"), 1)
+        self.assertLess(len(data), len(snapshot.encode(records)) / 2)
+
+    def test_load_indexed(self):
+        """Test that an indexed snapshot is loaded as Spans of a map"""
+        with open("test_snapshot.json", "wb") as f:
+            f.write(snapshot.encode(self.records, "indexed", ["name"]))
+        try:
+            spans = snapshot.load("test_snapshot.json")
+            self.assertEqual(list(spans), list(self.records))
+            for key, span in spans.items():
+                with self.subTest(key=key):
+                    self.assertIs(type(span), snapshot.Span)
+                    self.assertEqual(span.decode(), self.records[key])
+                    self.assertEqual(span, self.records[key])
+                    self.assertEqual(snapshot.plain(span), self.records[key])
+                    self.assertEqual(span.get("name"),
+                                     self.records[key].get("name"))
+            self.assertIsNone(spans["Place.3"].get("latitude"))
+            data = snapshot.encode(spans, "indexed")
+            self.assertEqual(snapshot.spans(data), spans)
+            self.assertEqual(snapshot.spans(data)["State.1"].get("name"),
+                             "California")
+        finally:
+            os.remove("test_snapshot.json")
+
+    def test_unknown_format(self):
+        """Test that an unknown format raises ValueError"""
+        with self.assertRaises(ValueError):
+            snapshot.encode(self.records, "xml")
+
+    def test_convert(self):
+        """Test that convert switches a snapshot to the other format"""
+        with open("test_snapshot.json", "wb") as f:
+            f.write(snapshot.encode(self.records))
+        try:
+            snapshot.convert("test_snapshot.json", "test_snapshot.msgpack")
+            with open("test_snapshot.msgpack", "rb") as f:
+                data = f.read()
+            self.assertTrue(data.startswith(snapshot.magic))
+            self.assertEqual(snapshot.decode(data), self.records)
+            snapshot.convert("test_snapshot.msgpack", "test_snapshot.json")
+            with open("test_snapshot.json", "rb") as f:
+                self.assertEqual(f.read(), snapshot.encode(self.records))
+        finally:
+            for path in ["test_snapshot.json", "test_snapshot.msgpack"]:
+                if os.path.exists(path):
+                    os.remove(path)
@@ -7,7 +7,9 @@ from datetime import datetime
 import inspect
 import models
 from models import place
+from models.amenity import Amenity
 from models.base_model import BaseModel
+from models.review import Review
 import pep8
 import unittest
 Place = place.Place
@@ -171,6 +173,7 @@ class TestPlace(unittest.TestCase):
         self.assertEqual(type(place.amenity_ids), list)
         self.assertEqual(len(place.amenity_ids), 0)
 
+    @unittest.skipIf(models.base_model.slots, "instances have no __dict__")
     def test_to_dict_creates_dict(self):
         """test to_dict method creates a dictionary with proper attrs"""
         p = Place()
@@ -193,8 +196,42 @@ class TestPlace(unittest.TestCase):
         self.assertEqual(new_d["created_at"], p.created_at.strftime(t_format))
         self.assertEqual(new_d["updated_at"], p.updated_at.strftime(t_format))
 
+    @unittest.skipIf(models.base_model.slots, "instances have no __dict__")
     def test_str(self):
         """test that the str method has the correct output"""
         place = Place()
         string = "[Place] ({}) {}".format(place.id, place.__dict__)
         self.assertEqual(string, str(place))
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing File Storage")
+    def test_reviews(self):
+        """test that reviews lists the reviews with the place's id"""
+        place = Place()
+        review = Review(place_id=place.id)
+        other = Review(place_id="another place")
+        for obj in [place, review, other]:
+            models.storage.new(obj)
+        self.assertEqual(place.reviews, [review])
+        models.storage.delete(review)
+        self.assertEqual(place.reviews, [])
+        for obj in [place, other]:
+            models.storage.delete(obj)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing File Storage")
+    def test_amenities(self):
+        """test that amenities links amenities through amenity_ids"""
+        place = Place()
+        wifi = Amenity(name="Wifi")
+        pool = Amenity(name="Pool")
+        for obj in [place, wifi, pool]:
+            models.storage.new(obj)
+        place.amenities = wifi
+        place.amenities = wifi
+        place.amenities = place
+        self.assertEqual(place.amenity_ids, [wifi.id])
+        self.assertEqual(place.amenities, [wifi])
+        self.assertEqual(Place().amenity_ids, [])
+        self.assertEqual(wifi.place_amenities, [place])
+        self.assertEqual(pool.place_amenities, [])
+        for obj in [place, wifi, pool]:
+            models.storage.delete(obj)
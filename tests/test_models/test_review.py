@@ -94,6 +94,7 @@ class TestReview(unittest.TestCase):
         else:
             self.assertEqual(review.text, "")
 
+    @unittest.skipIf(models.base_model.slots, "instances have no __dict__")
     def test_to_dict_creates_dict(self):
         """test to_dict method creates a dictionary with proper attrs"""
         r = Review()
@@ -116,6 +117,7 @@ class TestReview(unittest.TestCase):
         self.assertEqual(new_d["created_at"], r.created_at.strftime(t_format))
         self.assertEqual(new_d["updated_at"], r.updated_at.strftime(t_format))
 
+    @unittest.skipIf(models.base_model.slots, "instances have no __dict__")
     def test_str(self):
         """test that the str method has the correct output"""
         review = Review()
@@ -8,6 +8,7 @@ import inspect
 import models
 from models import state
 from models.base_model import BaseModel
+from models.city import City
 import pep8
 import unittest
 State = state.State
@@ -76,6 +77,7 @@ class TestState(unittest.TestCase):
         else:
             self.assertEqual(state.name, "")
 
+    @unittest.skipIf(models.base_model.slots, "instances have no __dict__")
     def test_to_dict_creates_dict(self):
         """test to_dict method creates a dictionary with proper attrs"""
         s = State()
@@ -98,8 +100,23 @@ class TestState(unittest.TestCase):
         self.assertEqual(new_d["created_at"], s.created_at.strftime(t_format))
         self.assertEqual(new_d["updated_at"], s.updated_at.strftime(t_format))
 
+    @unittest.skipIf(models.base_model.slots, "instances have no __dict__")
     def test_str(self):
         """test that the str method has the correct output"""
         state = State()
         string = "[State] ({}) {}".format(state.id, state.__dict__)
         self.assertEqual(string, str(state))
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing File Storage")
+    def test_cities(self):
+        """test that cities lists the cities with the state's id"""
+        state = State()
+        city = City(state_id=state.id)
+        other = City(state_id="another state")
+        for obj in [state, city, other]:
+            models.storage.new(obj)
+        self.assertEqual(state.cities, [city])
+        city.state_id = other.state_id
+        self.assertEqual(state.cities, [])
+        for obj in [state, city, other]:
+            models.storage.delete(obj)